@@ -0,0 +1,68 @@
+""" Import time of the EasySCPI modules, and a guard that they do not load pyvisa.
+
+Every target is imported in a fresh interpreter several times and the fastest run is reported. The script
+exits with an error if pyvisa is loaded by any target, or if a target takes longer than --budget milliseconds.
+
+Usage: python benchmarks/import_time.py [--repeat 5] [--budget 500]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# Statements run in a fresh interpreter; none of them should load pyvisa
+_TARGETS = {
+    'easyscpi': 'import easyscpi',
+    'easyscpi.Element': 'import easyscpi; easyscpi.Element',
+    'easyscpi.VoltUnit': 'import easyscpi; easyscpi.VoltUnit',
+    'easyscpi.DMM6500': 'import easyscpi; easyscpi.DMM6500',
+    'easyscpi.DP832': 'import easyscpi; easyscpi.DP832',
+    'dmm6500.Trace': 'from dmm6500.Trace import Element',
+    'dmm6500.Sense': 'from dmm6500.Sense import Function, Range',
+    'utils.Units': 'from utils.Units import VoltUnit',
+    'simulator': 'from simulator.SimulatedResourceManager import SimulatedResourceManager',
+}
+
+_PROBE = """
+import sys, time
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start, 'pyvisa' in sys.modules)
+"""
+
+
+def measure(statement: str, repeat: int):
+    """ Return the fastest import time in seconds of a statement and whether it loaded pyvisa. """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [_SRC, os.environ.get('PYTHONPATH')])))
+    best, loaded = float('inf'), False
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(statement=statement)], env=environment,
+                                capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(output[0]))
+        loaded = loaded or output[1] == 'True'
+    return best, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per target')
+    parser.add_argument('--budget', type=float, default=None, help='maximum milliseconds per target')
+    arguments = parser.parse_args()
+
+    failures = []
+    print(f"{'target':<20}{'ms':>10}  pyvisa")
+    for name, statement in _TARGETS.items():
+        seconds, loaded = measure(statement, arguments.repeat)
+        print(f"{name:<20}{seconds * 1000:>10.1f}  {'loaded' if loaded else '-'}")
+        if loaded:
+            failures.append(f"{name} loads pyvisa")
+        if arguments.budget is not None and seconds * 1000 > arguments.budget:
+            failures.append(f"{name} takes {seconds * 1000:.1f} ms, more than {arguments.budget} ms")
+    if failures:
+        sys.exit('\n'.join(failures))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+""" Reading throughput of the fetch, parse and statistics paths, measured against the simulated DMM6500.
+
+Every case runs on buffers of several sizes and reports readings per second, bytes per second received, peak
+memory allocated by Python and numpy (tracemalloc) and round trips to the instrument, which count every message
+sent, writes included, since each one pays the latency of the link. The simulator answers in process, so the
+times include formatting the responses on the instrument side; use --latency and --bandwidth to model a real
+link. Results can be saved as a baseline and later runs compared against it.
+
+Usage: python benchmarks/throughput.py [--sizes 1000 100000] [--save baseline.json] [--compare baseline.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from dmm6500.DMM6500 import DMM6500  # noqa: E402
+from dmm6500.Trace import Element  # noqa: E402
+from dmm6500.Trace import Format  # noqa: E402
+from simulator.SimulatedDMM6500 import SimulatedDMM6500  # noqa: E402
+from simulator.SimulatedResourceManager import SimulatedResourceManager  # noqa: E402
+from utils.Metrics import Metrics  # noqa: E402
+from utils.Units import VoltUnit  # noqa: E402
+
+_RESOURCE = 'TCPIP::127.0.0.1::INSTR'
+_BUFFER = 'defbuffer1'
+
+
+def _split_and_float(dmm: DMM6500, size: int):
+    # The loop of the original example, kept as the reference for the vectorized paths
+    return [float(value) for value in dmm.trace.data(size, _BUFFER, Element.READING).split(',')]
+
+
+# Name, function of (dmm, size) and largest size it runs on by default; None for all sizes
+CASES = [
+    ('ascii_split_float', _split_and_float, 1000000),
+    ('ascii_reading', lambda dmm, size: dmm.trace.fetch(size, _BUFFER, Element.READING, Format.ASCII), 1000000),
+    ('sreal_reading', lambda dmm, size: dmm.trace.fetch(size, _BUFFER, Element.READING, Format.SREAL), None),
+    ('real_reading', lambda dmm, size: dmm.trace.fetch(size, _BUFFER, Element.READING, Format.REAL), None),
+    ('ascii_columns', lambda dmm, size: dmm.trace.columns(size, _BUFFER, [Element.READING, Element.RELATIVE],
+                                                          Format.ASCII), 1000000),
+    ('real_columns', lambda dmm, size: dmm.trace.columns(size, _BUFFER, [Element.READING, Element.RELATIVE],
+                                                         Format.REAL), None),
+    ('ascii_timestamps', lambda dmm, size: dmm.trace.columns(size, _BUFFER, [Element.READING, Element.TIMESTAMP],
+                                                             Format.ASCII), 1000000),
+    ('stats', lambda dmm, size: dmm.trace.stats(_BUFFER), None),
+    ('units_convert', lambda dmm, size: [VoltUnit.MILLI.convert(value) for value in dmm.readings[:size]], 1000000),
+    ('units_convert_array', lambda dmm, size: VoltUnit.MILLI.convert_array(dmm.readings[:size]), None),
+]
+
+
+def open_dmm(size: int, latency: float, bandwidth: float, planner: bool = True) -> DMM6500:
+    """ Return a DMM6500 connected to a simulator whose default buffer holds size readings. """
+    simulator = SimulatedDMM6500(capacity=size)
+    readings = 3.3 + numpy.random.default_rng(0).normal(0.0, 1e-3, size)
+    simulator.load(_BUFFER, readings)
+    dmm = DMM6500(SimulatedResourceManager({_RESOURCE: simulator}, latency=latency, bandwidth=bandwidth))
+    dmm.open(_RESOURCE)
+    if not planner:
+        dmm.trace.planner = None
+    dmm.readings = readings  # Host copy for the cases that only format
+    return dmm
+
+
+def measure(dmm: DMM6500, function, size: int, repeat: int) -> dict:
+    """ Run a case repeat times and return its best time, with bytes, round trips and peak memory of one run. """
+    metrics = Metrics()
+    dmm.add_listener(metrics)
+    function(dmm, size)
+    dmm.remove_listener(metrics)
+    summary = metrics.summary().values()
+    received = sum(command.bytes_received for command in summary)
+    round_trips = sum(command.count for command in summary)
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(dmm, size)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    function(dmm, size)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': best, 'readings_per_second': size / best, 'bytes_per_second': received / best,
+            'peak_bytes': peak, 'round_trips': round_trips}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """ Return a line for every result whose reading rate fell more than tolerance below the baseline. """
+    regressions = []
+    for key, result in results.items():
+        if key not in baseline:
+            continue
+        ratio = result['readings_per_second'] / baseline[key]['readings_per_second']
+        if ratio < 1 - tolerance:
+            regressions.append(f"{key}: {ratio:.2f}x the baseline reading rate")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000, 10000000])
+    parser.add_argument('--cases', nargs='+', default=[name for name, _, _ in CASES],
+                        help='cases to run; all by default')
+    parser.add_argument('--all-sizes', action='store_true',
+                        help='run the ASCII and per-value cases on sizes above one million readings too')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per case; the fastest is reported')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every message')
+    parser.add_argument('--bandwidth', type=float, default=None, help='bytes per second of the link')
+    parser.add_argument('--no-planner', action='store_true',
+                        help='send every range as a single query instead of the sub-queries of the FetchPlanner')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='slowdown allowed against the baseline')
+    arguments = parser.parse_args()
+
+    results = {}
+    print(f"{'case':<22}{'readings':>10}{'readings/s':>14}{'MB/s':>10}{'peak MB':>10}{'trips':>7}")
+    for size in arguments.sizes:
+        dmm = open_dmm(size, arguments.latency, arguments.bandwidth, not arguments.no_planner)
+        for name, function, limit in CASES:
+            if name not in arguments.cases or (limit is not None and size > limit and not arguments.all_sizes):
+                continue
+            result = results[f"{name}/{size}"] = measure(dmm, function, size, arguments.repeat)
+            print(f"{name:<22}{size:>10}{result['readings_per_second']:>14.4g}"
+                  f"{result['bytes_per_second'] / 1e6:>10.2f}{result['peak_bytes'] / 1e6:>10.1f}"
+                  f"{result['round_trips']:>7}")
+        dmm.close()
+
+    if arguments.save:
+        with open(arguments.save, 'w') as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            regressions = compare(results, json.load(file), arguments.tolerance)
+        if regressions:
+            sys.exit('\n'.join(regressions))
+        print(f"No case slower than {1 - arguments.tolerance:.0%} of the baseline")
+
+
+if __name__ == '__main__':
+    main()
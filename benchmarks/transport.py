@@ -0,0 +1,110 @@
+""" Latency and throughput of the transports of a DMM6500: VXI-11, raw SCPI sockets through VISA and the built-in
+socket client.
+
+Without --host, the transports are measured against a local TCP stand-in, a SimulatedServer that serves the
+simulated DMM6500 on the loopback interface, next to the in-process simulator as the floor. The pyvisa-py socket
+is included when pyvisa-py is installed. VXI-11 needs an RPC server, so it is only measured against a real
+instrument: with --host, the readings already in defbuffer1 are fetched over TCPIP::<host>::INSTR,
+TCPIP::<host>::5025::SOCKET through VISA and the same socket through the built-in client.
+
+Usage: python benchmarks/transport.py [--readings 1000000] [--queries 2000] [--host 192.168.252.20]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from dmm6500.DMM6500 import DMM6500  # noqa: E402
+from dmm6500.Trace import Element  # noqa: E402
+from dmm6500.Trace import Format  # noqa: E402
+from simulator.SimulatedDMM6500 import SimulatedDMM6500  # noqa: E402
+from simulator.SimulatedResourceManager import SimulatedResourceManager  # noqa: E402
+from simulator.SimulatedServer import SimulatedServer  # noqa: E402
+from utils.Metrics import Metrics  # noqa: E402
+from utils.SocketResourceManager import SocketResourceManager  # noqa: E402
+
+_BUFFER = 'defbuffer1'
+
+
+def visa_manager(backend: str = ''):
+    """ Return a pyvisa ResourceManager of the backend, or None when it is not installed. """
+    try:
+        import pyvisa
+        return pyvisa.ResourceManager(backend)
+    except Exception:
+        return None
+
+
+def measure(dmm: DMM6500, readings: int, queries: int, repeat: int) -> dict:
+    """ Return the round trip percentiles of *IDN? and the best transfer rate of readings in SREAL and ASCII. """
+    dmm.query_id()
+    times = numpy.empty(queries)
+    for i in range(queries):
+        start = time.perf_counter()
+        dmm.query_id()
+        times[i] = time.perf_counter() - start
+    result = {'p50': numpy.percentile(times, 50), 'p95': numpy.percentile(times, 95)}
+    for data_format in (Format.SREAL, Format.ASCII):
+        metrics = Metrics()
+        dmm.add_listener(metrics)
+        dmm.trace.fetch(readings, _BUFFER, Element.READING, data_format)
+        dmm.remove_listener(metrics)
+        received = sum(command.bytes_received for command in metrics.summary().values())
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            dmm.trace.fetch(readings, _BUFFER, Element.READING, data_format)
+            best = min(best, time.perf_counter() - start)
+        result[data_format.name] = received / best
+    return result
+
+
+def transports(arguments):
+    """ Yield the label, resource manager and resource name of every transport to measure. """
+    if arguments.host:
+        yield 'VXI-11 (VISA)', visa_manager(), f"TCPIP::{arguments.host}::INSTR"
+        yield 'socket (VISA)', visa_manager(), f"TCPIP::{arguments.host}::5025::SOCKET"
+        yield 'socket (built-in)', SocketResourceManager(), f"TCPIP::{arguments.host}::5025::SOCKET"
+        return
+    simulator = SimulatedDMM6500(capacity=arguments.readings)
+    simulator.load(_BUFFER, 3.3 + numpy.random.default_rng(0).normal(0.0, 1e-3, arguments.readings))
+    yield 'in-process', SimulatedResourceManager({'SIM': simulator}), 'SIM'
+    with SimulatedServer(simulator) as server:
+        yield 'socket (pyvisa-py)', visa_manager('@py'), server.resource_name
+        yield 'socket (built-in)', SocketResourceManager(), server.resource_name
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--readings', type=int, default=1000000, help='readings fetched per transfer')
+    parser.add_argument('--queries', type=int, default=2000, help='round trips timed')
+    parser.add_argument('--repeat', type=int, default=3, help='transfers per format; the fastest is reported')
+    parser.add_argument('--host', help='address of a DMM6500 to measure instead of the local stand-in')
+    arguments = parser.parse_args()
+
+    print(f"{'transport':<22}{'p50 us':>10}{'p95 us':>10}{'SREAL MB/s':>12}{'ASCII MB/s':>12}")
+    for label, resource_manager, resource_name in transports(arguments):
+        if resource_manager is None:
+            print(f"{label:<22}  skipped: pyvisa or its backend is not installed")
+            continue
+        dmm = DMM6500(resource_manager)
+        dmm.open(resource_name)
+        try:
+            readings = arguments.readings
+            if arguments.host:
+                readings = min(readings, dmm.trace.actual(_BUFFER))
+                if not readings:
+                    sys.exit(f"{_BUFFER} of {arguments.host} is empty; store readings in it first")
+            result = measure(dmm, readings, arguments.queries, arguments.repeat)
+        finally:
+            dmm.close()
+        print(f"{label:<22}{result['p50'] * 1e6:>10.1f}{result['p95'] * 1e6:>10.1f}"
+              f"{result['SREAL'] / 1e6:>12.2f}{result['ASCII'] / 1e6:>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
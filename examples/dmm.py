@@ -1,51 +1,42 @@
-import time
-
 import pyvisa as visa
 
 from dmm6500.DMM6500 import DMM6500
 from dmm6500.Sense import Function
+from dmm6500.Sense import Range
+from dmm6500.Sense import Speed
 from dmm6500.Trace import Element
+from dmm6500.Trace import Format
+from utils.SocketResourceManager import SocketResourceManager
 
-rm = visa.ResourceManager()
+rm = SocketResourceManager(visa.ResourceManager())
 try:
     read_seconds = 5
 
     dmm = DMM6500(rm)
-    dmm.open('TCPIP::192.168.252.20::INSTR')
+    dmm.open('TCPIP::192.168.252.20::5025::SOCKET')  # Raw SCPI socket; '...::INSTR' for VXI-11
     dmm.clear()
     dmm.reset()
     print(dmm.query_id())
 
-    dmm.sense.function(Function.VOLTAGE_DC)     # Configure to Measure VDC
+    # Measure VDC on the 10 V range with the NPLC, autozero, auto-delay and filter settings of a speed preset
+    dmm.sense.speed(Function.VOLTAGE_DC, Speed.BALANCED, Range.VOLTAGE_DC_10V)
+    print(f"{dmm.reading_rate(0.5):.0f} readings/s")  # Short calibration run with the present settings
+    dmm.trace.clear("defbuffer1")               # Drop the readings of the calibration run
     dmm.trigger.duration_loop(read_seconds, 0, "defbuffer1")  # Trigger model will measure for 5 seconds
     dmm.init()                   # Start the trigger model
-    dmm.wait()                   # Wait for the trigger model to complete
-    time.sleep(read_seconds)
+    if not dmm.wait_complete(read_seconds * 2):  # Wait for the trigger model to complete
+        dmm.trigger.abort()      # Don't fetch a partial buffer
+        dmm.close()
+        raise SystemExit(f"Trigger model did not complete in {read_seconds * 2} s")
 
     max_read_data = dmm.trace.actual("defbuffer1")
-    dmm_values = dmm.trace.data(max_read_data, "defbuffer1", Element.READING).split(',')
-    dmm_timestamps = dmm.trace.data(max_read_data, "defbuffer1", Element.RELATIVE).split(',')
-
-    # Convert from string to float
-    for i in range(0, len(dmm_timestamps)):
-        dmm_timestamps[i] = float(dmm_timestamps[i])
-        dmm_values[i] = float(dmm_values[i])
+    # Transfer readings and timestamps as one binary block straight into NumPy arrays (use Format.ASCII to compare)
+    columns = dmm.trace.columns(max_read_data, "defbuffer1", [Element.READING, Element.RELATIVE], Format.REAL)
+    dmm_values = columns[Element.READING]
+    dmm_timestamps = columns[Element.RELATIVE]
 
-    print(dmm.trace.stats_average("defbuffer1"))
-    print(dmm.trace.stats_max("defbuffer1"))
-    print(dmm.trace.stats_min("defbuffer1"))
-    print(dmm.trace.stats_peak_to_peak("defbuffer1"))
+    print(dmm.trace.stats("defbuffer1"))   # All statistics in one round trip
 
     dmm.close()                         # Close session
-
-    # dmm.write(':SENS:FUNC "VOLT:DC"')   # Set the instrument to measure DC voltage
-    # dmm.write(':SENS:VOLT:RANG 10')     # Set the measure range to 10 V
-    # dmm.write(':SENS:VOLT:INP AUTO')    # Set the input impedance to auto so the instrument selects 10 Ω for the 10 V range
-    # dmm.write(':SENS:VOLT:NPLC 10')     # Set the integration rate (NPLCs) to 10
-    # dmm.write(':SENS:VOLT:AZER ON')     # Enable autozero
-    # dmm.write(':SENS:VOLT:AVER:TCON REP')   # Set the averaging filter type to repeating
-    # dmm.write(':SENS:VOLT:AVER:COUN 100')   # Set the filter count to 100
-    # dmm.write(':SENS:VOLT:AVER ON')     # Enable the filter
-    # dmm.write(':READ?')                 # Read the voltage value; it is a few seconds before the reading is returned
-except visa.VisaIOError as err:
+except (visa.VisaIOError, OSError) as err:
     print("Failed to open resource. Error: ", err)
@@ -0,0 +1,61 @@
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from dmm6500.DMM6500 import DMM6500
+from utils.Async import AsyncProxy
+
+if TYPE_CHECKING:
+    from pyvisa import ResourceManager
+
+
+class AsyncDMM6500(AsyncProxy):
+    """ DMM6500 whose methods, and the methods of its subsystems, are awaitable.
+
+    Blocking VISA I/O runs in an executor with a single thread unless another executor is given, so
+    asyncio.gather can talk to several instruments at the same time.
+
+    Examples
+    --------
+    >>> dmm = AsyncDMM6500(rm)
+    >>> await dmm.open('TCPIP::192.168.252.20::INSTR')
+    >>> count = await dmm.trace.actual("defbuffer1")
+    """
+
+    def __init__(self, resource_manager: 'ResourceManager', executor: Executor = None) -> None:
+        super().__init__(DMM6500(resource_manager), executor or ThreadPoolExecutor(max_workers=1))
+
+    @property
+    def trace(self) -> AsyncProxy:
+        return AsyncProxy(self._target.trace, self._executor)
+
+    @property
+    def trigger(self) -> AsyncProxy:
+        return AsyncProxy(self._target.trigger, self._executor)
+
+    @property
+    def sense(self) -> AsyncProxy:
+        return AsyncProxy(self._target.sense, self._executor)
+
+    @asynccontextmanager
+    async def batch(self, opc: bool = False):
+        """ Queue the commands of all subsystems and send them when the block exits.
+
+        The batch is shared by the threads of the executor, so the commands are queued whichever worker runs
+        them, and the batch can be opened and closed on different workers.
+
+        Parameters
+        ----------
+        opc : bool
+            True to wait for the instrument to complete all the commands with *OPC? after sending them
+        """
+        manager = self._target.batch(opc, shared=True)
+        await self._run(manager.__enter__)
+        try:
+            yield self
+        except BaseException as err:
+            if not await self._run(manager.__exit__, type(err), err, err.__traceback__):
+                raise
+        else:
+            await self._run(manager.__exit__, None, None, None)
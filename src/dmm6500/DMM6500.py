@@ -1,16 +1,28 @@
-from pyvisa import ResourceManager
-from pyvisa.resources import MessageBasedResource
+from typing import TYPE_CHECKING
 
+import numpy
+
+from dmm6500.FetchPlanner import FetchPlanner
 from dmm6500.Sense import Sense
+from dmm6500.Trace import Element
+from dmm6500.Trace import Format
 from dmm6500.Trace import Trace
 from dmm6500.Trigger import Trigger
+from utils import Completion
+from utils.Session import Session
+
+if TYPE_CHECKING:
+    from pyvisa import ResourceManager
+    from pyvisa.resources import MessageBasedResource
 
 
 class DMM6500:
-    def __init__(self, resource_manager: ResourceManager) -> None:
+    def __init__(self, resource_manager: 'ResourceManager') -> None:
         super().__init__()
         self._resourceManager = resource_manager
         self._dmm = None
+        self._listeners = []
+        self.planner = FetchPlanner()
         self.trace: Trace = None
         self.trigger: Trigger = None
         self.sense: Sense = None
@@ -18,17 +30,21 @@ class DMM6500:
     def open(self, resource_name: str):
         """ Return an instrument for the resource name. A session will be created.
 
+        Raw sockets, e.g. 'TCPIP::192.168.252.20::5025::SOCKET', have no end of message signal, so commands
+        sent to them end with a line feed.
+
         Parameters
         ----------
         resource_name : str
             Name or alias of the resource to open.
         """
-        self._dmm = self._resourceManager.open_resource(resource_name)  # type: MessageBasedResource
-        self._dmm.timeout = 5000  # ms
-        self._dmm.encoding = 'latin_1'
-        self._dmm.read_termination = '\n'
-        self._dmm.write_termination = None
-        self.trace = Trace(self._dmm)
+        resource = self._resourceManager.open_resource(resource_name)  # type: MessageBasedResource
+        resource.timeout = 5000  # ms
+        resource.encoding = 'latin_1'
+        resource.read_termination = '\n'
+        resource.write_termination = '\n' if resource_name.upper().endswith('::SOCKET') else None
+        self._dmm = Session(resource, listeners=self._listeners)
+        self.trace = Trace(self._dmm, self.planner)
         self.trigger = Trigger(self._dmm)
         self.sense = Sense(self._dmm)
 
@@ -36,6 +52,44 @@ class DMM6500:
         """ Close the resource manager session. """
         self._dmm.close()
 
+    def batch(self, opc: bool = False, shared: bool = False):
+        """ Return a context manager that queues the commands of all subsystems and sends them on exit.
+
+        The queued commands are joined with ';' in as few messages as the input buffer of the instrument allows.
+
+        Parameters
+        ----------
+        opc : bool
+            True to wait for the instrument to complete all the commands with *OPC? after sending them
+        shared : bool
+            True to queue the commands sent by every thread, not only those of the thread that opens the batch
+        """
+        return self._dmm.batch(opc, shared)
+
+    def add_listener(self, listener):
+        """ Register a function called after every message sent to the instrument.
+
+        The listener is called with the headers of the commands in the message joined by ';', the bytes sent,
+        the bytes received and the seconds it took. A Metrics instance can be used as listener. Nothing is timed
+        while there are no listeners.
+
+        Parameters
+        ----------
+        listener : callable
+            Function to call
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Unregister a function registered with add_listener.
+
+        Parameters
+        ----------
+        listener : callable
+            Function to unregister
+        """
+        self._listeners.remove(listener)
+
     def clear(self):
         """ Send command that clears the event registers and queues """
         self._dmm.write('*cls')  # clear ESR
@@ -43,6 +97,8 @@ class DMM6500:
     def reset(self):
         """ Send command that resets the instrument settings to their default values and clears the reading buffers """
         self._dmm.write('*rst')  # Reset the DMM6500
+        if self.trace is not None:
+            self.trace.forget_format()  # *RST selects ASCII
 
     def query_id(self) -> str:
         """ Send command that retrieves the identification string of the instrument """
@@ -56,3 +112,107 @@ class DMM6500:
         """ Send command that postpones the execution of subsequent commands until all previous overlapped
         commands are finished. """
         self._dmm.write('*WAI')
+
+    def wait_complete(self, timeout: float = None) -> bool:
+        """ Wait until the trigger model and any other overlapped command are finished.
+
+        When the interface supports service requests, the instrument is asked to request service once *OPC
+        completes and no query is sent while waiting. Otherwise the state of the trigger model is polled,
+        quickly at first and then less often, until it is no longer running.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait; forever by default
+        Returns
+        -------
+        bool
+            True if the operations completed, False on timeout.
+        """
+        completed = Completion.wait_service_request(self._dmm, timeout)
+        if completed is not None:
+            return completed
+        return Completion.poll(lambda: not self.trigger.state().active(), timeout)
+
+    def reading_rate(self, duration: float = 1.0, buffer: str = "defbuffer1") -> float:
+        """ Measure with the present settings for a short time and return the readings per second achieved.
+
+        The buffer is cleared and filled by a DurationLoop, and the rate is computed from the relative
+        timestamps of its oldest and newest readings, so it includes every delay of the trigger model. A rate
+        cannot be computed from fewer than two readings, so the duration must be long enough for the settings,
+        e.g. a few seconds with a filter or an NPLC of 10.
+
+        Parameters
+        ----------
+        duration : float
+            Seconds to measure
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        Raises
+        ------
+        RuntimeError
+            If fewer than two readings were stored in the duration.
+        """
+        with self._dmm.batch():
+            self.trace.clear(buffer)
+            self.trigger.duration_loop(duration, 0, buffer)
+            self.init()
+        if not self.wait_complete(2 * duration + 5):
+            raise TimeoutError(f"Calibration run did not finish in {2 * duration + 5} s")
+        count = self.trace.actual(buffer)
+        if count < 2:
+            raise RuntimeError(f"{count} readings stored in {duration} s; measure for longer to compute a rate")
+        last = self.trace.actual_end(buffer)
+        first = last - count + 1
+        if first < 1:
+            first += self.trace.points(buffer)
+        oldest = self.trace.fetch(first, buffer, Element.RELATIVE, Format.REAL, first)[0]
+        newest = self.trace.fetch(last, buffer, Element.RELATIVE, Format.REAL, last)[0]
+        return (count - 1) / (newest - oldest)
+
+    def digitize(self, function, sample_rate: int, count: int, buffer: str = "defbuffer1", aperture: float = None,
+                 data_format=Format.SREAL, timeout: float = None) -> numpy.ndarray:
+        """ Capture count digitized readings at a fixed sample rate and return them.
+
+        The digitize function, the buffer and a trigger model with a single measure block are configured and
+        the trigger model started in one batch. Once it is finished, the readings are retrieved as binary blocks
+        in the sub-queries planned by the FetchPlanner. Single precision halves the transfer and is enough for the
+        resolution of digitized readings.
+
+        Parameters
+        ----------
+        function : DigitizeFunction
+            Digitize function to use
+        sample_rate : int
+            Readings per second, from 1000 to 1000000
+        count : int
+            Number of readings to capture
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer. It is cleared and resized to count readings
+        aperture : float
+            Aperture in seconds; the maximum the sample rate allows by default
+        data_format : Format
+            Binary format of the transfer, Format.SREAL or Format.REAL
+        timeout : float
+            Seconds to wait for the capture; twice its duration plus five seconds by default
+        Returns
+        -------
+        numpy.ndarray
+            Readings in capture order; reading i was sampled i / sample_rate seconds after the first.
+        """
+        with self._dmm.batch():
+            self.sense.digitize_function(function)
+            self.sense.sample_rate(function, sample_rate)
+            self.sense.aperture(function, aperture)
+            self.sense.digitize_count(count)
+            self.trace.resize(buffer, max(count, 10))
+            self.trace.clear(buffer)
+            self.trigger.simple_loop(1, 0, buffer)
+            self.init()
+        if timeout is None:
+            timeout = 2 * count / sample_rate + 5
+        if not self.wait_complete(timeout):
+            raise TimeoutError(f"Digitizing {count} readings did not finish in {timeout} s")
+        return self.trace.fetch(count, buffer, Element.READING, data_format)
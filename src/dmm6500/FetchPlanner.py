@@ -0,0 +1,162 @@
+import math
+import threading
+from typing import NamedTuple
+
+from dmm6500.Trace import Element
+from dmm6500.Trace import Format
+
+# Bytes of one value of each element in ASCII, with its separator, e.g. '-3.278240000E-01,'
+_ASCII_BYTES = {Element.READING: 17, Element.RELATIVE: 17, Element.TIMESTAMP: 30, Element.FORMATTED: 16}
+_BINARY_BYTES = {Format.REAL: 8, Format.SREAL: 4}
+_BLOCK_HEADER = 11  # '#9' and nine digits of length
+_PAGE = 4096
+
+
+class SubQuery(NamedTuple):
+    start_index: int  # First index of the range
+    end_index: int  # Last index of the range
+    size: int  # Estimated bytes of the response
+    timeout: int  # VISA timeout in milliseconds
+    chunk_size: int  # VISA read chunk size in bytes
+
+
+class FetchPlanner:
+    """ Plans the transfer of a range of a reading buffer as sub-queries sized to the speed of the link.
+
+    The size of the response is estimated from the number of readings, the elements and the format. The range
+    is split into sub-queries that each take about target_seconds at the rate of the link, so a large buffer
+    never runs into the timeout of the session, and every sub-query reads its response in as few VISA reads as
+    possible. The rate is learned from the transfers recorded, as an exponentially weighted moving average of
+    bytes per second, and every sub-query is planned with the rate learned from the previous ones.
+
+    Parameters
+    ----------
+    rate : float
+        Bytes per second assumed before the first transfer is recorded
+    target_seconds : float
+        Duration of a sub-query at the learned rate
+    margin : float
+        Factor applied to the expected duration of a sub-query to get its timeout
+    slack : float
+        Seconds added to the timeout for the latency and for the instrument to prepare the response
+    max_chunk_size : int
+        Largest read chunk size in bytes
+    min_chunk_size : int
+        Smallest read chunk size in bytes
+    smoothing : float
+        Weight of the newest transfer in the moving average, between 0 and 1
+    min_sample : int
+        Smallest transfer in bytes used to learn the rate, since the latency dominates smaller ones
+
+    Examples
+    --------
+    >>> planner = FetchPlanner()
+    >>> for query in planner.plan(1, 1000000, [Element.READING], Format.SREAL):
+    ...     print(query.start_index, query.end_index, query.timeout, query.chunk_size)
+    """
+
+    def __init__(self, rate: float = 1e6, target_seconds: float = 2.0, margin: float = 2.0, slack: float = 2.0,
+                 max_chunk_size: int = 4 << 20, min_chunk_size: int = 20 * 1024, smoothing: float = 0.3,
+                 min_sample: int = 64 * 1024):
+        self.rate = rate
+        self.target_seconds = target_seconds
+        self.margin = margin
+        self.slack = slack
+        self.max_chunk_size = max_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.smoothing = smoothing
+        self.min_sample = min_sample
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    def size(self, count: int, elements, data_format) -> int:
+        """ Return the estimated bytes of the response with count readings of the elements in the format.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings
+        elements : list of Element
+            Elements of every reading
+        data_format : Format
+            Format of the transfer
+        """
+        header = 0 if data_format == Format.ASCII else _BLOCK_HEADER
+        return count * self.reading_size(elements, data_format) + header + 1
+
+    def reading_size(self, elements, data_format) -> int:
+        """ Return the estimated bytes of one reading with the elements in the format.
+
+        Parameters
+        ----------
+        elements : list of Element
+            Elements of every reading
+        data_format : Format
+            Format of the transfer
+        """
+        if data_format == Format.ASCII:
+            return sum(_ASCII_BYTES[element] for element in elements)
+        return _BINARY_BYTES[data_format] * len(elements)
+
+    def plan(self, start_index: int, end_index: int, elements, data_format):
+        """ Yield the SubQuery of every part of an index range, each planned with the rate learned so far.
+
+        The remaining range is split into equal parts that take at most target_seconds at the present rate,
+        so recording the transfer of a part before asking for the next one adapts the rest of the plan.
+
+        Parameters
+        ----------
+        start_index : int
+            First index of the range
+        end_index : int
+            Last index of the range
+        elements : list of Element
+            Elements of every reading
+        data_format : Format
+            Format of the transfer
+        """
+        reading_size = self.reading_size(elements, data_format)
+        index = start_index
+        while index <= end_index:
+            remaining = end_index - index + 1
+            readings = max(int(self.rate * self.target_seconds / reading_size), 1)
+            parts = math.ceil(remaining / readings)
+            count = math.ceil(remaining / parts)
+            yield self.sub_query(index, index + count - 1, elements, data_format)
+            index += count
+
+    def sub_query(self, start_index: int, end_index: int, elements, data_format) -> SubQuery:
+        """ Return the SubQuery of an index range, with the timeout and chunk size its size needs.
+
+        Parameters
+        ----------
+        start_index : int
+            First index of the range
+        end_index : int
+            Last index of the range
+        elements : list of Element
+            Elements of every reading
+        data_format : Format
+            Format of the transfer
+        """
+        size = self.size(end_index - start_index + 1, elements, data_format)
+        timeout = math.ceil((self.slack + self.margin * size / self.rate) * 1000)
+        pages = math.ceil(min(max(size + size // 4, self.min_chunk_size), self.max_chunk_size) / _PAGE)
+        return SubQuery(start_index, end_index, size, timeout, pages * _PAGE)
+
+    def record(self, size: int, seconds: float):
+        """ Learn the rate of the link from a transfer.
+
+        Parameters
+        ----------
+        size : int
+            Bytes received
+        seconds : float
+            Time the query and the read of its response took
+        """
+        if size < self.min_sample or seconds <= 0:
+            return
+        with self._lock:
+            rate = size / seconds
+            self.rate = rate if not self.samples else self.smoothing * rate + (1 - self.smoothing) * self.rate
+            self.samples += 1
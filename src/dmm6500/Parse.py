@@ -0,0 +1,147 @@
+""" Bulk parsers of :TRACe:DATA? responses that work on bytes with NumPy, without a Python object per reading. """
+import numpy
+
+_CHUNK = 1 << 13  # Fields gathered at a time, to bound the memory of the index arrays
+_PREFIXES = {'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'µ': 1e-6, 'm': 1e-3, 'k': 1e3, 'M': 1e6, 'G': 1e9}
+# MM/DD/YYYY hh:mm:ss.fffffffff
+_SEPARATORS = {2: ord('/'), 5: ord('/'), 10: ord(' '), 13: ord(':'), 16: ord(':'), 19: ord('.')}
+_TIMESTAMP_WIDTH = 29
+
+
+def fields(response) -> numpy.ndarray:
+    """ Split a comma-separated response into an array of bytes strings, one per field.
+
+    Fields are copied from the bytes of the response into a fixed-width array in blocks, so large responses
+    are split without creating a str per field. Surrounding white space and the line termination are kept,
+    and are ignored by the parsers of this module and by NumPy conversions to numbers.
+
+    Parameters
+    ----------
+    response : str or bytes
+        Response to :TRACe:DATA? in ASCII format
+    """
+    data = response.encode('latin_1') if isinstance(response, str) else bytes(response)
+    raw = numpy.frombuffer(data, dtype=numpy.uint8)
+    commas = numpy.flatnonzero(raw == ord(','))
+    starts = numpy.concatenate(([0], commas + 1))
+    lengths = numpy.concatenate((commas, [len(raw)])) - starts
+    width = max(int(lengths.max()), 1)
+    if (lengths == width).all():
+        # Every field has the same width, e.g. timestamps: a reshape without the commas is enough
+        table = numpy.concatenate((raw, numpy.array([ord(',')], dtype=numpy.uint8))).reshape(-1, width + 1)[:, :width]
+        return numpy.ascontiguousarray(table).view(f'S{width}').ravel()
+    result = numpy.zeros(len(starts), dtype=f'S{width}')
+    table = result.view(numpy.uint8).reshape(-1, width)
+    columns = numpy.arange(width)
+    padded = numpy.concatenate((raw, numpy.zeros(1, dtype=numpy.uint8)))
+    for first in range(0, len(starts), _CHUNK):
+        block = slice(first, first + _CHUNK)
+        inside = columns < lengths[block, None]
+        index = numpy.where(inside, starts[block, None] + columns, len(raw))
+        table[block] = padded[index]
+    return result
+
+
+def timestamps(values) -> numpy.ndarray:
+    """ Convert TIMESTAMP elements to a datetime64[ns] array with full nanosecond precision.
+
+    The digits of every field are read as bytes and combined with integer arithmetic, so no datetime or str
+    object is created per reading.
+
+    Parameters
+    ----------
+    values : str, bytes or numpy.ndarray
+        Response to :TRACe:DATA? with only the TIMESTAMP element, or an array of timestamps in the format
+        MM/DD/YYYY hh:mm:ss.fffffffff
+    """
+    rows = _rows(values, _TIMESTAMP_WIDTH)
+    for column, separator in _SEPARATORS.items():
+        if (rows[:, column] != separator).any():
+            raise ValueError("Timestamps must have the format MM/DD/YYYY hh:mm:ss.fffffffff")
+    rows[:, 20:][rows[:, 20:] == 0] = ord('0')  # Fewer than nine decimals
+    digits = rows[:, [0, 1, 3, 4, 6, 7, 8, 9, 11, 12, 14, 15, 17, 18] + list(range(20, 29))]
+    if ((digits < ord('0')) | (digits > ord('9'))).any():
+        raise ValueError("Timestamps must have the format MM/DD/YYYY hh:mm:ss.fffffffff")
+
+    def number(first: int, last: int) -> numpy.ndarray:
+        value = rows[:, first] - numpy.int64(ord('0'))
+        for column in range(first + 1, last):
+            value = value * 10 + (rows[:, column] - ord('0'))
+        return value
+
+    months = (number(6, 10) - 1970) * 12 + number(0, 2) - 1
+    days = months.astype('datetime64[M]').astype('datetime64[D]').astype(numpy.int64) + number(3, 5) - 1
+    seconds = ((days * 24 + number(11, 13)) * 60 + number(14, 16)) * 60 + number(17, 19)
+    return (seconds * 1000000000 + number(20, 29)).view('datetime64[ns]')
+
+
+def formatted(values, base_units: bool = False):
+    """ Split FORMATTED elements, e.g. '+1.2345 mV', into an array of values and an array of units.
+
+    Parameters
+    ----------
+    values : str, bytes or numpy.ndarray
+        Response to :TRACe:DATA? with only the FORMATTED element, or an array of formatted readings
+    base_units : bool
+        True to scale the values by the prefix of their unit and return the units without prefix
+    Returns
+    -------
+    tuple
+        float64 array of the values and str array of the units.
+    """
+    rows = _rows(values, 1)
+    width = rows.shape[1]
+    spaces = rows == ord(' ')
+    split = numpy.where(spaces.any(axis=1), spaces.argmax(axis=1), width)
+    columns = numpy.arange(width)
+    number = numpy.where(columns < split[:, None], rows, 0).astype(numpy.uint8)
+    readings = numpy.ascontiguousarray(number).view(f'S{width}').ravel().astype(numpy.float64)
+    index = split[:, None] + 1 + columns
+    unit = numpy.where(index < width, numpy.take_along_axis(rows, numpy.minimum(index, width - 1), axis=1), 0)
+    units = _text(numpy.ascontiguousarray(unit.astype(numpy.uint8)))
+    if base_units:
+        names, inverse = numpy.unique(units, return_inverse=True)
+        scales = numpy.array([_PREFIXES[name[0]] if len(name) > 1 and name[0] in _PREFIXES else 1.0
+                              for name in names])
+        readings = readings * scales[inverse.ravel()]
+        units = numpy.array([name[1:] if len(name) > 1 and name[0] in _PREFIXES else name
+                             for name in names])[inverse.ravel()]
+    return readings, units
+
+
+def text(values) -> numpy.ndarray:
+    """ Return the fields as a str array with surrounding white space removed.
+
+    Parameters
+    ----------
+    values : str, bytes or numpy.ndarray
+        Response to :TRACe:DATA?, or an array of fields
+    """
+    return _text(_rows(values, 1))
+
+
+def _rows(values, min_width: int) -> numpy.ndarray:
+    # Fields as a matrix of bytes, one row per field, without surrounding white space
+    if isinstance(values, (str, bytes)):
+        values = fields(values)
+    values = numpy.asarray(values)
+    if values.dtype.kind == 'U':
+        values = _bytes(values)
+    values = numpy.char.strip(values.ravel(), b' \t\r\n')
+    width = max(values.dtype.itemsize, min_width)
+    return numpy.ascontiguousarray(values.astype(f'S{width}')).view(numpy.uint8).reshape(-1, width)
+
+
+def _bytes(values: numpy.ndarray) -> numpy.ndarray:
+    # str to latin-1 bytes, one code point per byte
+    width = values.dtype.itemsize // 4
+    code_points = numpy.ascontiguousarray(values).view(numpy.uint32).reshape(-1, width)
+    if (code_points > 255).any():
+        raise ValueError("Fields must be latin-1 text")
+    return code_points.astype(numpy.uint8).view(f'S{max(width, 1)}').ravel()
+
+
+def _text(rows: numpy.ndarray) -> numpy.ndarray:
+    # Matrix of latin-1 bytes to a str array, one code point per byte
+    width = max(rows.shape[1], 1)
+    return numpy.ascontiguousarray(rows.astype(numpy.uint32)).view(f'U{width}').ravel()
@@ -0,0 +1,148 @@
+import time
+from typing import NamedTuple
+
+import numpy
+
+from dmm6500.DMM6500 import DMM6500
+from dmm6500.Trace import Element
+from dmm6500.Trace import Format
+
+
+class Readings(NamedTuple):
+    readings: numpy.ndarray  # Readings of one buffer fill
+    timestamps: numpy.ndarray  # Time of every reading as datetime64[ns]
+
+
+class PingPongMetrics(NamedTuple):
+    readings: int  # Readings streamed
+    swaps: int  # Buffer fills drained
+    dead_time: float  # Seconds lost between buffers beyond one reading interval
+    max_gap: float  # Longest time in seconds between two consecutive readings
+    dropped: int  # Readings estimated missing from the gaps between buffers
+
+
+class PingPong:
+    """ Gapless acquisition with two user buffers filled in turn by the trigger model.
+
+    The trigger model clears the first buffer, measures count readings into it, clears the second buffer,
+    measures count readings into it, and starts over. Once a buffer is full and the trigger model has moved on to
+    the other one, the full buffer is drained with its readings and timestamps, so measuring never stops for a
+    transfer. Each buffer must be drained within the time the other one takes to fill; readings overwritten
+    before they were drained show up as a gap in the timestamps and are counted as dropped.
+
+    Parameters
+    ----------
+    dmm : DMM6500
+        Open DMM6500, with the measure or digitize function already configured
+    count : int
+        Readings per buffer fill
+    buffers : tuple of str
+        Names of the two user buffers to create
+    poll_interval : float
+        Seconds to wait between polls while a buffer fills
+
+    Examples
+    --------
+    >>> acquisition = PingPong(dmm, count=10000)
+    >>> acquisition.start()
+    >>> for readings, timestamps in acquisition.stream():
+    ...     store.append(readings, timestamps)
+    ...     if done():
+    ...         acquisition.stop()
+    >>> acquisition.metrics()
+    """
+
+    def __init__(self, dmm: DMM6500, count: int = 10000, buffers=("ping", "pong"), poll_interval: float = 0.05):
+        self._dmm = dmm
+        self.count = count
+        self.buffers = tuple(buffers)
+        self.poll_interval = poll_interval
+        self._last = None
+        self._interval = None
+        self._readings = 0
+        self._swaps = 0
+        self._dead_time = 0.0
+        self._max_gap = 0.0
+        self._dropped = 0
+
+    def start(self):
+        """ Create the buffers, load the ping-pong trigger model and start it, in one batch. """
+        first, second = self.buffers
+        trigger = self._dmm.trigger
+        with self._dmm.batch():
+            for buffer in self.buffers:
+                self._dmm.trace.make(buffer, max(self.count, 10))
+            trigger.empty()
+            trigger.block_buffer_clear(1, first)
+            trigger.block_measure(2, first, self.count)
+            trigger.block_buffer_clear(3, second)
+            trigger.block_measure(4, second, self.count)
+            trigger.block_branch_always(5, 1)
+            self._dmm.init()
+
+    def stop(self):
+        """ Abort the trigger model. stream ends after draining the readings already measured. """
+        self._dmm.trigger.abort()
+
+    def close(self):
+        """ Abort the trigger model and delete the buffers. """
+        with self._dmm.batch():
+            self._dmm.trigger.abort()
+            for buffer in self.buffers:
+                self._dmm.trace.delete(buffer)
+
+    def stream(self):
+        """ Yield the Readings of every buffer fill in timestamp order, until the trigger model stops.
+
+        Yields
+        ------
+        Readings
+            Readings and timestamps of one buffer, continuing those of the previous one.
+        """
+        current = 0
+        while True:
+            counts, state = self._dmm.trace.actual_buffers(self.buffers)
+            running = state.active()
+            if running and counts[current] < self.count:
+                time.sleep(self.poll_interval)
+                continue
+            if counts[current]:
+                chunk = self._drain(self.buffers[current], counts[current])
+                if len(chunk.readings):
+                    yield chunk
+            if not running:
+                # The other buffer was filled after this one only if this one was full
+                other = 1 - current
+                if counts[current] >= self.count and counts[other]:
+                    chunk = self._drain(self.buffers[other], counts[other])
+                    if len(chunk.readings):
+                        yield chunk
+                return
+            current = 1 - current
+
+    def metrics(self) -> PingPongMetrics:
+        """ Return the readings streamed so far and the dead time and dropped readings between buffers. """
+        return PingPongMetrics(self._readings, self._swaps, self._dead_time, self._max_gap, self._dropped)
+
+    def _drain(self, buffer: str, end_index: int) -> Readings:
+        columns = self._dmm.trace.columns(end_index, buffer, [Element.READING, Element.TIMESTAMP], Format.ASCII)
+        readings, timestamps = columns[Element.READING], columns[Element.TIMESTAMP]
+        if self._last is not None:
+            # Readings of a buffer cleared and refilled during the transfer are older than the last one streamed
+            newer = timestamps > self._last
+            readings, timestamps = readings[newer], timestamps[newer]
+        if not len(readings):
+            return Readings(readings, timestamps)
+        steps = numpy.diff(timestamps).astype(numpy.float64) / 1e9
+        if len(steps):
+            self._interval = float(numpy.median(steps))
+            self._max_gap = max(self._max_gap, float(steps.max()))
+        if self._last is not None and self._interval:
+            gap = float((timestamps[0] - self._last) / numpy.timedelta64(1, 'ns')) / 1e9
+            self._max_gap = max(self._max_gap, gap)
+            self._dead_time += max(gap - self._interval, 0.0)
+            self._dropped += max(int(round(gap / self._interval)) - 1, 0)
+        self._last = timestamps[-1]
+        self._readings += len(readings)
+        self._swaps += 1
+        return Readings(readings, timestamps)
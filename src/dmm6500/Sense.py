@@ -1,9 +1,11 @@
-from pyvisa.resources import MessageBasedResource
 from enum import Enum
+from typing import NamedTuple
+
+from utils.Session import Session
 
 
 class Sense:
-    def __init__(self, dmm: MessageBasedResource):
+    def __init__(self, dmm: Session):
         self._dmm = dmm
 
     def function(self, function):
@@ -48,6 +50,190 @@ class Sense:
         """
         self._dmm.write(f":SENS:{function.value}:RANG {range.value}")
 
+    def auto_range(self, function, on: bool):
+        """ Send command that determines if the measurement range is set manually or automatically.
+
+        With autorange, the instrument searches for the best range before every measurement, which slows
+        down readings of a changing signal. Turning autorange off keeps the range presently in use.
+
+        Parameters
+        ----------
+        function : Function
+            Function to which the setting applies
+        on : bool
+            True to select the range automatically
+        """
+        state = 'ON' if on else 'OFF'
+        self._dmm.write(f":SENS:{function.value}:RANG:AUTO {state}")
+
+    def nplc(self, function, value: float):
+        """ Send command that sets the time that the input signal is measured for the selected function.
+
+        The integration rate is expressed in number of power line cycles (NPLC). Short integration times
+        give the fastest reading rate and more noise; long ones reject power line noise and give the best
+        resolution. Only the DC functions, resistance, diode and temperature integrate.
+
+        Parameters
+        ----------
+        function : Function
+            Function to which the setting applies
+        value : float
+            Number of power line cycles, from 0.0005 to 15
+        """
+        self._dmm.write(f":SENS:{function.value}:NPLC {value}")
+
+    def auto_zero(self, function, on: bool):
+        """ Send command that enables or disables automatic updates to the internal reference measurements
+        (autozero) of the instrument.
+
+        Autozero keeps readings accurate over time and temperature changes, at the cost of an extra reference
+        measurement that lowers the reading rate.
+
+        Parameters
+        ----------
+        function : Function
+            Function to which the setting applies
+        on : bool
+            True to enable autozero
+        """
+        state = 'ON' if on else 'OFF'
+        self._dmm.write(f":SENS:{function.value}:AZER {state}")
+
+    def auto_delay(self, function, on: bool):
+        """ Send command that enables or disables an automatic delay that occurs before each measurement.
+
+        The automatic delay lets the input settle after range and function changes. Disable it for the highest
+        reading rate when the signal is already settled.
+
+        Parameters
+        ----------
+        function : Function
+            Function to which the setting applies
+        on : bool
+            True to enable the automatic delay
+        """
+        state = 'ON' if on else 'OFF'
+        self._dmm.write(f":SENS:{function.value}:DEL:AUTO {state}")
+
+    def average(self, function, count: int = None, filter_type=None):
+        """ Send commands that configure and enable the averaging filter, or disable it.
+
+        The repeating filter stores count readings and returns their average, so it divides the reading rate by
+        count. The moving filter returns the average of the last count readings after every new one.
+
+        Parameters
+        ----------
+        function : Function
+            Function to which the setting applies
+        count : int
+            Number of readings averaged, from 1 to 100; None disables the filter
+        filter_type : Filter
+            Type of averaging filter; repeating by default
+        """
+        if count is None:
+            self._dmm.write(f":SENS:{function.value}:AVER OFF")
+            return
+        filter_type = filter_type or Filter.REPEAT
+        self._dmm.write(f":SENS:{function.value}:AVER:TCON {filter_type.value}")
+        self._dmm.write(f":SENS:{function.value}:AVER:COUN {count}")
+        self._dmm.write(f":SENS:{function.value}:AVER ON")
+
+    def speed(self, function, preset, range=None):
+        """ Send the commands of a speed preset for a function in a single batch.
+
+        Parameters
+        ----------
+        function : Function
+            Function to configure; it is also made the active function
+        preset : Speed
+            Trade-off between reading rate and accuracy
+        range : Range
+            Fixed range to use; presets without autorange keep the range in use by default
+        """
+        settings = preset.value
+        with self._dmm.batch():
+            self.function(function)
+            if range is not None:
+                self.range(function, range)
+            else:
+                self.auto_range(function, settings.auto_range)
+            self.nplc(function, settings.nplc)
+            self.auto_zero(function, settings.auto_zero)
+            self.auto_delay(function, settings.auto_delay)
+            self.average(function, settings.average_count)
+
+    def digitize_function(self, function):
+        """ Send command that selects the active digitize function.
+
+        Digitize functions make fast, non-integrating voltage or current measurements at a fixed sample rate, up
+        to 1,000,000 samples per second. Selecting a digitize function deactivates the measure function, and
+        selecting a measure function deactivates the digitize function.
+
+        Parameters
+        ----------
+        function : DigitizeFunction
+            Digitize function to activate
+        """
+        self._dmm.write(f":SENS:DIG:FUNC \"{function.value}\"")
+
+    def digitize_range(self, function, range):
+        """ Send command that selects the positive full-scale range of a digitize function.
+
+        Digitize functions have no autorange, so the range should be large enough for the whole signal.
+
+        Parameters
+        ----------
+        function : DigitizeFunction
+            Digitize function to which the setting applies
+        range : Range
+            Range to set for the digitize function
+        """
+        self._dmm.write(f":SENS:DIG:{function.value}:RANG {range.value}")
+
+    def sample_rate(self, function, rate: int):
+        """ Send command that defines the precise acquisition rate at which the digitize measurements are made.
+
+        The sample rate determines how fast the DMM6500 acquires a digitized reading. Set the sample rate before
+        setting the aperture. If the aperture setting is too high for the selected sample rate, it is
+        automatically adjusted to the highest aperture that can be used with the sample rate.
+
+        Parameters
+        ----------
+        function : DigitizeFunction
+            Digitize function to which the setting applies
+        rate : int
+            Readings per second, from 1000 to 1000000
+        """
+        self._dmm.write(f":SENS:DIG:{function.value}:SRAT {rate}")
+
+    def aperture(self, function, seconds: float = None):
+        """ Send command that determines the aperture setting for a digitize function.
+
+        The aperture is the actual acquisition time of the instrument on the signal. With the automatic
+        aperture, the aperture is set to the maximum that the sample rate allows.
+
+        Parameters
+        ----------
+        function : DigitizeFunction
+            Digitize function to which the setting applies
+        seconds : float
+            Aperture in seconds; automatic by default
+        """
+        aperture = "AUTO" if seconds is None else seconds
+        self._dmm.write(f":SENS:DIG:{function.value}:APER {aperture}")
+
+    def digitize_count(self, count: int):
+        """ Send command that sets the number of digitize measurements to make when a measurement is requested.
+
+        Every measure block of the trigger model makes count readings at the sample rate.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings, from 1 to 55000000
+        """
+        self._dmm.write(f":SENS:DIG:COUN {count}")
+
 
 class Function(Enum):
     VOLTAGE_DC = "VOLT:DC"
@@ -60,6 +246,32 @@ class Function(Enum):
     TEMPERATURE = "TEMP"
     CONTINUITY = "CONT"
 
+
+class Filter(Enum):
+    REPEAT = "REP"
+    MOVING = "MOV"
+
+
+class SpeedSettings(NamedTuple):
+    nplc: float  # Integration time in power line cycles
+    auto_zero: bool  # Refresh the internal references
+    auto_delay: bool  # Settle before every measurement
+    auto_range: bool  # Search the best range before every measurement
+    average_count: int  # Readings averaged by the repeating filter; None for no filter
+
+
+class Speed(Enum):
+    MAX_SPEED = SpeedSettings(0.0005, False, False, False, None)
+    BALANCED = SpeedSettings(1, True, True, True, None)
+    MAX_ACCURACY = SpeedSettings(10, True, True, True, 10)
+
+
+class DigitizeFunction(Enum):
+    NONE = "NONE"
+    VOLTAGE = "VOLT"
+    CURRENT = "CURR"
+
+
 class Range(Enum):
     VOLTAGE_DC_100mV = "100e-3"
     VOLTAGE_DC_1V = "1"
@@ -1,10 +1,41 @@
-from pyvisa.resources import MessageBasedResource
+import time
 from enum import Enum
+from typing import NamedTuple
+from typing import TYPE_CHECKING
+
+import numpy
+
+from dmm6500 import Parse
+from dmm6500.Trigger import State
+from utils.Session import Session
+
+if TYPE_CHECKING:
+    from dmm6500.FetchPlanner import FetchPlanner
 
 
 class Trace:
-    def __init__(self, dmm: MessageBasedResource):
+    """ Reading buffers of the DMM6500.
+
+    When a FetchPlanner is given, :TRACe:DATA? of a large index range is split into sub-queries sized to the
+    speed of the link, each sent with the timeout and read chunk size its response needs. The responses are
+    joined, so the methods return the same as with a single query.
+
+    The data format last selected is remembered. When a transfer needs another one, the :FORMat commands are
+    sent in the same message as its first :TRACe:DATA? query, and the format is left selected afterwards, so
+    consecutive binary transfers cost one message per query. Call forget_format after the instrument is reset.
+
+    Parameters
+    ----------
+    dmm : Session
+        Session of the instrument
+    planner : FetchPlanner
+        Planner of the transfers of reading buffers; every range is sent as a single query by default
+    """
+
+    def __init__(self, dmm: Session, planner: 'FetchPlanner' = None):
         self._dmm = dmm
+        self.planner = planner
+        self._format = None
 
     def actual(self, buffer: str) -> int:
         """ Send command that retrieves the number of readings in the specified reading buffer.
@@ -21,7 +52,59 @@ class Trace:
         """
         return int(self._dmm.query(f":TRACe:ACTual? \"{buffer}\""))
 
-    def data(self, end_index: int, buffer: str, element) -> str:
+    def actual_end(self, buffer: str) -> int:
+        """ Send command that retrieves the last index in a reading buffer.
+
+        When a buffer set to fill continuously wraps, the last index becomes smaller than the starting index
+        returned by :TRACe:ACTual:STARt?.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        Returns
+        -------
+        int
+            Index of the newest reading in the buffer; 0 if the buffer is empty.
+        """
+        return int(self._dmm.query(f":TRACe:ACTual:END? \"{buffer}\""))
+
+    def actual_buffers(self, buffers):
+        """ Send one message that retrieves the number of readings in several buffers and the trigger state.
+
+        The state is queried first, so when it is not running the counts read after it are final. Its response has
+        several fields, so the counts are taken from the end of the response.
+
+        Parameters
+        ----------
+        buffers : list of str
+            Names of the reading buffers
+        Returns
+        -------
+        tuple
+            Number of readings in every buffer, as a list, and the State of the trigger model.
+        """
+        queries = ";".join(f":TRACe:ACTual? \"{buffer}\"" for buffer in buffers)
+        response = self._dmm.query(f":TRIG:STAT?;{queries}").split(';')
+        return [int(count) for count in response[-len(buffers):]], State(response[0].strip())
+
+    def points(self, buffer: str) -> int:
+        """ Send command that retrieves the number of readings a reading buffer can store.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        Returns
+        -------
+        int
+            Capacity of the reading buffer.
+        """
+        return int(self._dmm.query(f":TRACe:POINts? \"{buffer}\""))
+
+    def data(self, end_index: int, buffer: str, element, start_index: int = 1) -> str:
         """ Send command that retrieves specified data elements from a specified reading buffer.
 
         The output of :TRACe:DATA? is affected by the data format selected by :FORMat[:DATA]. If you set
@@ -39,12 +122,289 @@ class Trace:
             name of a user-defined buffer
         element : Element
             Element in the buffer to print
+        start_index : int
+            Beginning index of the buffer to return; defaults to the first reading
         Returns
         -------
-        int
-            Data elements from a specified reading buffer.
+        str
+            Data elements from a specified reading buffer; the responses of the sub-queries of a FetchPlanner
+            are joined with ','.
+        """
+        return ",".join(list(self._transfer(start_index, end_index, buffer, [element], Format.ASCII)))
+
+    def fetch(self, end_index: int, buffer: str, element, data_format, start_index: int = 1) -> numpy.ndarray:
+        """ Send command that retrieves numeric data elements from a specified reading buffer as a NumPy array.
+
+        With Format.REAL or Format.SREAL the readings are transferred as an IEEE-488.2 definite-length binary
+        block and copied straight into the array, so no Python object is created per reading. With Format.ASCII
+        the comma-separated response is parsed by NumPy in a single call, also without an object per reading.
+        The data format is selected in the same message as the query, only when it differs from the last one.
+        With a FetchPlanner, a large range is transferred in sub-queries that are joined into one array.
+
+        Parameters
+        ----------
+        end_index : int
+            Ending index of the buffer to return
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        element : Element
+            Element in the buffer to print. Only READING and RELATIVE are numeric
+        data_format : Format
+            Format used to transfer the readings
+        start_index : int
+            Beginning index of the buffer to return; defaults to the first reading
+        Returns
+        -------
+        numpy.ndarray
+            Data elements from a specified reading buffer. float32 for SREAL, float64 otherwise.
+        """
+        if element not in (Element.READING, Element.RELATIVE):
+            raise ValueError(f"{element} is not a numeric element")
+        responses = list(self._transfer(start_index, end_index, buffer, [element], data_format))
+        if data_format == Format.ASCII:
+            responses = [numpy.fromstring(response, dtype=numpy.float64, sep=',') for response in responses]
+        return responses[0] if len(responses) == 1 else numpy.concatenate(responses)
+
+    def columns(self, end_index: int, buffer: str, elements, data_format, start_index: int = 1) -> dict:
+        """ Send command that retrieves several data elements from a specified reading buffer in one query.
+
+        The instrument returns the elements of each reading next to each other. The response is split into one
+        NumPy array per element, all aligned by reading, so every column comes from the same snapshot of the
+        buffer. READING and RELATIVE become float arrays, TIMESTAMP becomes a datetime64[ns] array and FORMATTED
+        becomes a string array, which Parse.formatted splits into values and units. Binary formats only support
+        READING and RELATIVE. With a FetchPlanner, a large range is transferred in sub-queries, each returning
+        all the elements of its readings.
+
+        Parameters
+        ----------
+        end_index : int
+            Ending index of the buffer to return
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        elements : list of Element
+            Elements in the buffer to retrieve, in the order they are requested
+        data_format : Format
+            Format used to transfer the readings
+        start_index : int
+            Beginning index of the buffer to return; defaults to the first reading
+        Returns
+        -------
+        dict
+            Column of each requested Element.
         """
-        return self._dmm.query(f":TRACe:DATA? 1, {end_index}, \"{buffer}\", {element.value}")
+        if data_format != Format.ASCII:
+            for element in elements:
+                if element not in (Element.READING, Element.RELATIVE):
+                    raise ValueError(f"{element} is not available in {data_format}")
+        parts = [_columns(response, elements, data_format)
+                 for response in list(self._transfer(start_index, end_index, buffer, elements, data_format))]
+        if len(parts) == 1:
+            return parts[0]
+        return {element: numpy.concatenate([part[element] for part in parts]) for element in elements}
+
+    def blocks(self, end_index: int, buffer: str, elements, data_format, start_index: int = 1):
+        """ Send commands that retrieve numeric data elements from a specified reading buffer as binary blocks.
+
+        Every sub-query of the FetchPlanner, or the whole range without one, is yielded as soon as it is read,
+        as a table with one row per reading and one column per element, in the order they are requested. The
+        table is a view of the received block, so its columns can be copied straight to their destination,
+        e.g. the files of a TraceStore, without joining the sub-queries first.
+
+        Parameters
+        ----------
+        end_index : int
+            Ending index of the buffer to return
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        elements : list of Element
+            Elements in the buffer to retrieve; only READING and RELATIVE
+        data_format : Format
+            Binary format used to transfer the readings, Format.REAL or Format.SREAL
+        start_index : int
+            Beginning index of the buffer to return; defaults to the first reading
+        Yields
+        -------
+        numpy.ndarray
+            Readings of one sub-query, with one column per element.
+        """
+        if data_format == Format.ASCII:
+            raise ValueError("Blocks need a binary format")
+        for element in elements:
+            if element not in (Element.READING, Element.RELATIVE):
+                raise ValueError(f"{element} is not available in {data_format}")
+        for response in self._transfer(start_index, end_index, buffer, elements, data_format):
+            yield response.reshape(-1, len(elements))
+
+    def _transfer(self, start_index: int, end_index: int, buffer: str, elements, data_format):
+        # Yields the responses of the sub-queries of an index range, str in ASCII and numpy.ndarray in a binary
+        # format. The session is held by every sub-query and released before its response is yielded, so the
+        # generator can be suspended and resumed on another thread, like the workers of an async executor.
+        names = ", ".join(element.value for element in elements)
+        if self.planner is None:
+            command = f":TRACe:DATA? {start_index}, {end_index}, \"{buffer}\", {names}"
+            with self._dmm.transfer():
+                response = self._query(command, data_format)
+            yield response
+            return
+        for query in self.planner.plan(start_index, end_index, elements, data_format):
+            command = f":TRACe:DATA? {query.start_index}, {query.end_index}, \"{buffer}\", {names}"
+            with self._dmm.transfer(query.timeout, query.chunk_size):
+                start = time.perf_counter()
+                response = self._query(command, data_format)
+                seconds = time.perf_counter() - start
+            self.planner.record(len(response) if data_format == Format.ASCII else response.nbytes, seconds)
+            yield response
+
+    def _query(self, command: str, data_format):
+        # Prefix the commands that select the data format when the instrument may have another one
+        if self._format != data_format:
+            selection = f":FORM:DATA {data_format.value}"
+            if data_format != Format.ASCII:
+                selection = f":FORM:BORD SWAP;{selection}"
+            command = f"{selection};{command}"
+            self._format = None  # Unknown if the query fails
+        if data_format == Format.ASCII:
+            response = self._dmm.query(command)
+        else:
+            response = self._dmm.query_binary_values(command, datatype=data_format.datatype(), is_big_endian=False,
+                                                     container=numpy.array)
+        self._format = data_format
+        return response
+
+    def stream(self, buffer: str, element, data_format, poll_interval: float = 0.2, max_chunk: int = 100000):
+        """ Retrieve readings from a reading buffer as they are stored while the trigger model is running.
+
+        The fill level of the buffer and the trigger model state are polled together in one query. Only the
+        index range stored since the previous poll is fetched, so every reading is transferred once. When a
+        buffer set to fill continuously wraps, the range is fetched in two parts: up to the end of the buffer
+        and then from its beginning. The poll interval must be shorter than the time it takes to fill the whole
+        buffer, otherwise overwritten readings cannot be detected. Iteration stops once the trigger model is no
+        longer running and all stored readings were yielded. Call it after INIT on a cleared buffer.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        element : Element
+            Element in the buffer to retrieve. Only READING and RELATIVE are numeric
+        data_format : Format
+            Format used to transfer the readings
+        poll_interval : float
+            Seconds to wait between polls when no new readings were stored
+        max_chunk : int
+            Maximum number of readings transferred by a single query
+        Yields
+        -------
+        numpy.ndarray
+            Readings stored since the previous chunk.
+        """
+        for start_index, end_index in self._new_ranges(buffer, poll_interval, max_chunk):
+            yield self.fetch(end_index, buffer, element, data_format, start_index=start_index)
+
+    def stream_columns(self, buffer: str, elements, data_format, poll_interval: float = 0.2, max_chunk: int = 100000):
+        """ Retrieve several data elements from a reading buffer as they are stored while the trigger model is
+        running.
+
+        Works like stream, but every chunk holds the columns of the elements, as returned by columns.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        elements : list of Element
+            Elements in the buffer to retrieve
+        data_format : Format
+            Format used to transfer the readings
+        poll_interval : float
+            Seconds to wait between polls when no new readings were stored
+        max_chunk : int
+            Maximum number of readings transferred by a single query
+        Yields
+        -------
+        dict
+            Column of each requested Element with the readings stored since the previous chunk.
+        """
+        for start_index, end_index in self._new_ranges(buffer, poll_interval, max_chunk):
+            yield self.columns(end_index, buffer, elements, data_format, start_index=start_index)
+
+    def stream_blocks(self, buffer: str, elements, data_format, poll_interval: float = 0.2, max_chunk: int = 100000):
+        """ Retrieve numeric data elements from a reading buffer as binary blocks while the trigger model is
+        running.
+
+        Works like stream, but yields the tables of blocks instead of arrays.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        elements : list of Element
+            Elements in the buffer to retrieve; only READING and RELATIVE
+        data_format : Format
+            Binary format used to transfer the readings, Format.REAL or Format.SREAL
+        poll_interval : float
+            Seconds to wait between polls when no new readings were stored
+        max_chunk : int
+            Maximum number of readings transferred by a single query
+        Yields
+        -------
+        numpy.ndarray
+            Readings stored since the previous block, with one column per element.
+        """
+        for start_index, end_index in self._new_ranges(buffer, poll_interval, max_chunk):
+            yield from self.blocks(end_index, buffer, elements, data_format, start_index=start_index)
+
+    def _new_ranges(self, buffer: str, poll_interval: float, max_chunk: int):
+        capacity = self.points(buffer)
+        last = 0
+        while True:
+            # The state is queried first, so once it is not running the end index read after it is final
+            response = self._dmm.query(f":TRIG:STAT?;:TRACe:ACTual:END? \"{buffer}\"").split(';')
+            running = State(response[0].strip()).active()
+            end = int(response[-1])
+            if end == last:
+                if not running:
+                    return
+                time.sleep(poll_interval)
+                continue
+            if end > last:
+                ranges = [(last + 1, end)]
+            elif last == capacity:
+                ranges = [(1, end)]
+            else:
+                ranges = [(last + 1, capacity), (1, end)]
+            for start_index, end_index in ranges:
+                for chunk_start in range(start_index, end_index + 1, max_chunk):
+                    yield chunk_start, min(chunk_start + max_chunk - 1, end_index)
+            last = end
+
+    def format(self, data_format):
+        """ Send command that selects the data format that is used when transferring readings over the remote
+        interface.
+
+        This command only affects the output of :TRACe:DATA?, :READ?, :FETCh?, :MEASure?, and :TRACe:LIST? over a
+        remote interface. REAL and SREAL transfer readings as IEEE-488.2 definite-length binary blocks in the byte
+        order selected by :FORMat:BORDer, which is set to SWAP (little-endian) with them, as the fetch methods expect.
+
+        Parameters
+        ----------
+        data_format : Format
+            Format to use when transferring readings
+        """
+        if data_format == Format.ASCII:
+            self._dmm.write(f":FORM:DATA {data_format.value}")
+        else:
+            self._dmm.write(f":FORM:BORD SWAP;:FORM:DATA {data_format.value}")
+        self._format = data_format
+
+    def forget_format(self):
+        """ Forget the data format last selected, e.g. after a reset, so the next transfer selects it again. """
+        self._format = None
 
     def make(self, buffer: str, size: int):
         """ Send command that creates a user-defined reading buffer.
@@ -87,6 +447,32 @@ class Trace:
         """
         return self._dmm.write(f":TRACe:DEL \"{buffer}\"")
 
+    def clear(self, buffer: str):
+        """ Send command that clears all readings and statistics from the specified buffer.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        """
+        self._dmm.write(f":TRACe:CLEar \"{buffer}\"")
+
+    def resize(self, buffer: str, size: int):
+        """ Send command that sets the number of readings a buffer can store.
+
+        Changing the capacity of a buffer clears it.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        size : int
+            Number of readings the buffer can store; minimum is 10
+        """
+        self._dmm.write(f":TRACe:POINts {size}, \"{buffer}\"")
+
     def stats_clear(self, buffer: str):
         """ Send command to clear all readings and statistics from the specified buffer.
 
@@ -163,9 +549,109 @@ class Trace:
         """
         return float(self._dmm.query(f":TRAC:STAT:PK2Pk? \"{buffer}\""))
 
+    def stats_std_dev(self, buffer: str) -> float:
+        """ Send command that retrieves the standard deviation of all readings in the buffer.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        Returns
+        -------
+        float
+            Standard deviation of all readings in the buffer.
+        """
+        return float(self._dmm.query(f":TRAC:STAT:STDD? \"{buffer}\""))
+
+    def stats(self, buffer: str):
+        """ Send one command that retrieves all the statistics of the reading buffer.
+
+        Parameters
+        ----------
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        Returns
+        -------
+        Statistics
+            Average, maximum, minimum, peak-to-peak, standard deviation and number of readings of the buffer.
+        """
+        return self.stats_buffers([buffer])[buffer]
+
+    def stats_buffers(self, buffers) -> dict:
+        """ Send one command that retrieves all the statistics of several reading buffers.
+
+        The statistics queries of every buffer are joined into a single message, so all of them are answered
+        in one round trip.
+
+        Parameters
+        ----------
+        buffers : list of str
+            Strings that indicate the reading buffers; the default buffers (defbuffer1 or defbuffer2) or the
+            names of user-defined buffers
+        Returns
+        -------
+        dict
+            Statistics of each buffer, by buffer name.
+        """
+        headers = [":TRAC:STAT:AVER?", ":TRAC:STAT:MAX?", ":TRAC:STAT:MIN?", ":TRAC:STAT:PK2Pk?", ":TRAC:STAT:STDD?",
+                   ":TRACe:ACTual?"]
+        command = ";".join(f"{header} \"{buffer}\"" for buffer in buffers for header in headers)
+        values = self._dmm.query(command).split(';')
+        stats = {}
+        for i, buffer in enumerate(buffers):
+            average, maximum, minimum, peak_to_peak, std_dev, count = values[i * len(headers):(i + 1) * len(headers)]
+            stats[buffer] = Statistics(float(average), float(maximum), float(minimum), float(peak_to_peak),
+                                       float(std_dev), int(count))
+        return stats
+
+
+class Statistics(NamedTuple):
+    average: float
+    maximum: float
+    minimum: float
+    peak_to_peak: float
+    std_dev: float
+    count: int
+
+
+def _columns(response, elements, data_format) -> dict:
+    if data_format != Format.ASCII:
+        table = response.reshape(-1, len(elements))
+        return {element: table[:, i] for i, element in enumerate(elements)}
+    if all(element in (Element.READING, Element.RELATIVE) for element in elements):
+        table = numpy.fromstring(response, dtype=numpy.float64, sep=',').reshape(-1, len(elements))
+        return {element: table[:, i] for i, element in enumerate(elements)}
+    table = Parse.fields(response).reshape(-1, len(elements))
+    return {element: _column(element, table[:, i]) for i, element in enumerate(elements)}
+
+
+def _column(element, values: numpy.ndarray) -> numpy.ndarray:
+    if element == Element.TIMESTAMP:
+        return Parse.timestamps(values)
+    elif element == Element.FORMATTED:
+        return Parse.text(values)
+    else:
+        return values.astype(numpy.float64)
+
 
 class Element(Enum):
     FORMATTED = "FORM"  # The measured value as it appears on the front panel
     READING = "READ"  # The measurement reading
     RELATIVE = "REL"  # The relative time when the data point was measured
     TIMESTAMP = "TST"  # The timestamp when the data point was measured
+
+
+class Format(Enum):
+    ASCII = "ASC"  # Comma-separated text
+    REAL = "REAL"  # Binary IEEE-754 double precision (8 bytes per value)
+    SREAL = "SRE"  # Binary IEEE-754 single precision (4 bytes per value)
+
+    def datatype(self) -> str:
+        if self.value == "REAL":
+            return 'd'
+        elif self.value == "SRE":
+            return 'f'
+        else:
+            raise ValueError("ASCII is not a binary format")
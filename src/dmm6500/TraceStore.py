@@ -0,0 +1,219 @@
+import os
+import struct
+
+import numpy
+
+from dmm6500.Trace import Element
+from dmm6500.Trace import Format
+from dmm6500.Trace import Trace
+
+_MAGIC = b"EZSCPI01"
+_HEADER = struct.Struct("<8sQ")  # magic, number of readings
+_COLUMNS = ("reading", "relative")
+
+
+class TraceStore:
+    """ Readings and relative timestamps kept on disk in memory-mapped columnar files.
+
+    The store is a directory with one file per column. Every file has a 16-byte header, with a magic string and
+    the number of readings stored, followed by the values as little-endian float64. Files grow by doubling,
+    so appending is amortized constant time, and opening an existing directory continues where it was left.
+    Readings and windows are returned as views of the mapped files, so any window of a long capture can be read
+    without loading the rest.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the store; created if it does not exist
+    capacity : int
+        Number of readings the files are created for
+
+    Examples
+    --------
+    >>> store = TraceStore("capture")
+    >>> dmm.init()
+    >>> store.record(dmm.trace, "defbuffer1")
+    >>> readings, relative = store.time_window(10.0, 20.0)
+    """
+
+    def __init__(self, path: str, capacity: int = 1 << 20):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._count = 0
+        self._maps = {}
+        files = [self._file(column) for column in _COLUMNS]
+        if all(os.path.exists(file) for file in files):
+            with open(files[0], "rb") as header:
+                magic, self._count = _HEADER.unpack(header.read(_HEADER.size))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a trace store")
+            capacity = max((os.path.getsize(files[0]) - _HEADER.size) // 8, 1)
+        self._map(capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def readings(self) -> numpy.ndarray:
+        """ All the readings stored, as a view of the mapped file """
+        return self._maps["reading"][:self._count]
+
+    @property
+    def relative(self) -> numpy.ndarray:
+        """ Relative time of all the readings stored, as a view of the mapped file """
+        return self._maps["relative"][:self._count]
+
+    def window(self, start: int, stop: int):
+        """ Return the readings and relative times from index start up to, but not including, stop, as views.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first reading, starting at 0
+        stop : int
+            Index after the last reading
+        """
+        return self.readings[start:stop], self.relative[start:stop]
+
+    def time_window(self, begin: float, end: float):
+        """ Return the readings and relative times measured from begin up to, but not including, end, as views.
+
+        Relative times must increase along the store, as they do within one run of the trigger model.
+
+        Parameters
+        ----------
+        begin : float
+            Relative time in seconds of the first reading
+        end : float
+            Relative time in seconds after the last reading
+        """
+        start, stop = numpy.searchsorted(self.relative, [begin, end])
+        return self.window(start, stop)
+
+    def reserve(self, count: int):
+        """ Return writable views of the mapped files for the next count readings.
+
+        Write the readings and relative times into the views and then call commit, so data fetched from the
+        instrument is copied once, straight into the files.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings to write
+        """
+        capacity = len(self._maps["reading"])
+        if self._count + count > capacity:
+            self._grow(max(capacity * 2, self._count + count))
+        end = self._count + count
+        return self._maps["reading"][self._count:end], self._maps["relative"][self._count:end]
+
+    def commit(self, count: int):
+        """ Add to the store the readings written into the views returned by reserve.
+
+        Parameters
+        ----------
+        count : int
+            Number of readings written
+        """
+        self._count += count
+
+    def append(self, readings, relative):
+        """ Add readings and their relative times to the store.
+
+        Parameters
+        ----------
+        readings : array_like
+            Readings to store
+        relative : array_like
+            Relative time of each reading in seconds
+        """
+        reading_view, relative_view = self.reserve(len(readings))
+        reading_view[:] = readings
+        relative_view[:] = relative
+        self.commit(len(readings))
+
+    def fetch(self, trace: Trace, buffer: str, end_index: int, start_index: int = 1):
+        """ Retrieve a range of readings and relative times as binary blocks and add them to the store.
+
+        The columns of every block are copied straight into the views returned by reserve.
+
+        Parameters
+        ----------
+        trace : Trace
+            Trace subsystem of the DMM6500
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        end_index : int
+            Ending index of the buffer to retrieve
+        start_index : int
+            Beginning index of the buffer to retrieve; defaults to the first reading
+        """
+        for table in trace.blocks(end_index, buffer, [Element.READING, Element.RELATIVE], Format.REAL,
+                                  start_index=start_index):
+            self._store(table)
+
+    def record(self, trace: Trace, buffer: str, poll_interval: float = 0.2, max_chunk: int = 100000) -> int:
+        """ Add the readings of a buffer to the store as they are measured, until the trigger model stops.
+
+        The columns of every block are copied straight into the views returned by reserve.
+
+        Parameters
+        ----------
+        trace : Trace
+            Trace subsystem of the DMM6500
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        poll_interval : float
+            Seconds to wait between polls when no new readings were stored
+        max_chunk : int
+            Maximum number of readings transferred by a single query
+        Returns
+        -------
+        int
+            Number of readings added.
+        """
+        count = self._count
+        for table in trace.stream_blocks(buffer, [Element.READING, Element.RELATIVE], Format.REAL, poll_interval,
+                                         max_chunk):
+            self._store(table)
+        self.flush()
+        return self._count - count
+
+    def flush(self):
+        """ Write the readings and the header to disk. """
+        for column in _COLUMNS:
+            self._maps[column].flush()
+            with open(self._file(column), "r+b") as file:
+                file.write(_HEADER.pack(_MAGIC, self._count))
+
+    def close(self):
+        """ Flush the store and unmap its files. """
+        self.flush()
+        self._maps = {}
+
+    def _store(self, table: numpy.ndarray):
+        # Readings in the first column and relative times in the second, as received
+        readings, relative = self.reserve(len(table))
+        readings[:] = table[:, 0]
+        relative[:] = table[:, 1]
+        self.commit(len(table))
+
+    def _file(self, column: str) -> str:
+        return os.path.join(self.path, f"{column}.f8")
+
+    def _map(self, capacity: int):
+        for column in _COLUMNS:
+            file = self._file(column)
+            if not os.path.exists(file):
+                with open(file, "wb") as new:
+                    new.write(_HEADER.pack(_MAGIC, 0))
+            with open(file, "r+b") as resized:
+                resized.truncate(_HEADER.size + capacity * 8)
+            self._maps[column] = numpy.memmap(file, dtype="<f8", mode="r+", offset=_HEADER.size, shape=(capacity,))
+
+    def _grow(self, capacity: int):
+        self.flush()
+        self._maps = {}
+        self._map(capacity)
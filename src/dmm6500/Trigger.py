@@ -1,8 +1,10 @@
-from pyvisa.resources import MessageBasedResource
+from enum import Enum
+
+from utils.Session import Session
 
 
 class Trigger:
-    def __init__(self, dmm: MessageBasedResource):
+    def __init__(self, dmm: Session):
         self._dmm = dmm
 
     def duration_loop(self, duration: int, delay: int, buffer: str):
@@ -57,3 +59,78 @@ class Trigger:
         cleared so the trigger model has no blocks defined.
         """
         self._dmm.write(f"TRIG:LOAD \"Empty\"")
+
+    def block_buffer_clear(self, block: int, buffer: str):
+        """ Send command that defines a trigger-model block that clears a reading buffer.
+
+        Parameters
+        ----------
+        block : int
+            The sequence of the block in the trigger model
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        """
+        self._dmm.write(f":TRIG:BLOC:BUFF:CLE {block}, \"{buffer}\"")
+
+    def block_measure(self, block: int, buffer: str, count: int = 1):
+        """ Send command that defines a trigger-model block that makes or digitizes measurements.
+
+        The block stores count readings in the buffer, at the reading rate of the measure function or at the
+        sample rate of the digitize function, before the trigger model moves to the next block.
+
+        Parameters
+        ----------
+        block : int
+            The sequence of the block in the trigger model
+        buffer : str
+            A string that indicates the reading buffer; the default buffers (defbuffer1 or defbuffer2) or the
+            name of a user-defined buffer
+        count : int
+            Number of readings to make
+        """
+        self._dmm.write(f":TRIG:BLOC:MDIG {block}, \"{buffer}\", {count}")
+
+    def block_branch_always(self, block: int, branch_to: int):
+        """ Send command that defines a trigger-model block that always goes to a specific block.
+
+        Parameters
+        ----------
+        block : int
+            The sequence of the block in the trigger model
+        branch_to : int
+            The block number to execute when the trigger model reaches this block
+        """
+        self._dmm.write(f":TRIG:BLOC:BRAN:ALW {block}, {branch_to}")
+
+    def block_list(self) -> str:
+        """ Send command that returns the settings for all trigger-model blocks. """
+        return self._dmm.query(":TRIG:BLOC:LIST?")
+
+    def abort(self):
+        """ Send command that stops all trigger model commands on the instrument. """
+        self._dmm.write(":ABOR")
+
+    def state(self):
+        """ Send command that retrieves the present state of the trigger model.
+
+        Returns
+        -------
+        State
+            State of the trigger model.
+        """
+        return State(self._dmm.query(":TRIG:STAT?").split(';')[0].strip())
+
+
+class State(Enum):
+    IDLE = "IDLE"  # Trigger model is stopped
+    RUNNING = "RUNNING"  # Trigger model is running
+    WAITING = "WAITING"  # Trigger model has been in the same wait block for more than 100 ms
+    EMPTY = "EMPTY"  # Trigger model is selected, but no blocks are defined
+    BUILDING = "BUILDING"  # Blocks have been added
+    FAILED = "FAILED"  # Trigger model is stopped because of an error
+    ABORTING = "ABORTING"  # Trigger model is stopping
+    ABORTED = "ABORTED"  # Trigger model is stopped
+
+    def active(self) -> bool:
+        return self in (State.RUNNING, State.WAITING, State.ABORTING)
@@ -0,0 +1,70 @@
+from concurrent.futures import Executor
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from dp832.DP832 import DP832
+from utils.Async import AsyncProxy
+
+if TYPE_CHECKING:
+    from pyvisa import ResourceManager
+
+
+class AsyncDP832(AsyncProxy):
+    """ DP832 whose methods, and the methods of its subsystems, are awaitable.
+
+    Blocking VISA I/O runs in an executor with a single thread unless another executor is given, so
+    asyncio.gather can talk to several instruments at the same time.
+
+    Examples
+    --------
+    >>> dp832 = AsyncDP832(rm)
+    >>> await dp832.open('TCPIP::192.168.252.18::INSTR')
+    >>> async with dp832.batch():
+    ...     await dp832.source.voltage(1, 3.3)
+    """
+
+    def __init__(self, resource_manager: 'ResourceManager', executor: Executor = None) -> None:
+        super().__init__(DP832(resource_manager), executor or ThreadPoolExecutor(max_workers=1))
+
+    @property
+    def instrument(self) -> AsyncProxy:
+        return AsyncProxy(self._target.instrument, self._executor)
+
+    @property
+    def output(self) -> AsyncProxy:
+        return AsyncProxy(self._target.output, self._executor)
+
+    @property
+    def timer(self) -> AsyncProxy:
+        return AsyncProxy(self._target.timer, self._executor)
+
+    @property
+    def source(self) -> AsyncProxy:
+        return AsyncProxy(self._target.source, self._executor)
+
+    @property
+    def measure(self) -> AsyncProxy:
+        return AsyncProxy(self._target.measure, self._executor)
+
+    @asynccontextmanager
+    async def batch(self, opc: bool = False):
+        """ Queue the commands of all subsystems and send them when the block exits.
+
+        The batch is shared by the threads of the executor, so the commands are queued whichever worker runs
+        them, and the batch can be opened and closed on different workers.
+
+        Parameters
+        ----------
+        opc : bool
+            True to wait for the instrument to complete all the commands with *OPC? after sending them
+        """
+        manager = self._target.batch(opc, shared=True)
+        await self._run(manager.__enter__)
+        try:
+            yield self
+        except BaseException as err:
+            if not await self._run(manager.__exit__, type(err), err, err.__traceback__):
+                raise
+        else:
+            await self._run(manager.__exit__, None, None, None)
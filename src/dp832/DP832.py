@@ -1,48 +1,221 @@
-from pyvisa import ResourceManager
-from pyvisa.resources import MessageBasedResource
+from typing import TYPE_CHECKING
 
 from dp832.Instrument import Instrument
+from dp832.Measure import Measure
 from dp832.Output import Output
+from dp832.Profile import ChannelProfile
+from dp832.Profile import Profile
 from dp832.Source import Source
 from dp832.Timer import Timer
+from utils import Completion
+from utils.Session import Session
+from utils.StateCache import StateCache
+
+if TYPE_CHECKING:
+    from pyvisa import ResourceManager
+    from pyvisa.resources import MessageBasedResource
 
 
 class DP832:
-    def __init__(self, resource_manager: ResourceManager) -> None:
+    def __init__(self, resource_manager: 'ResourceManager') -> None:
         super().__init__()
         self._resourceManager = resource_manager
         self._dp832 = None
+        self._listeners = []
         self.instrument: Instrument = None
         self.output: Output = None
         self.timer: Timer = None
         self.source: Source = None
+        self.measure: Measure = None
 
-    def open(self, resource_name: str):
+    def open(self, resource_name: str, cache: bool = False, cache_ttl: float = None):
         """ Return an instrument for the resource name. A session will be created.
 
+        With the state cache enabled, setting the channel, output state, protections, voltage or current to the
+        value they already have sends nothing, and querying them is answered from the last value written or read.
+        Settings changed from the front panel or by a protection trip are not seen until the cache expires or
+        is invalidated. Raw sockets, e.g. 'TCPIP::192.168.252.18::5025::SOCKET', have no end of message signal,
+        so commands sent to them end with a line feed.
+
         Parameters
         ----------
         resource_name : str
             Name or alias of the resource to open.
+        cache : bool
+            True to remember the settings of the instrument and skip redundant commands
+        cache_ttl : float
+            Seconds after which a remembered setting expires; never by default
         """
-        self._dp832 = self._resourceManager.open_resource(resource_name)  # type: MessageBasedResource
-        self._dp832.read_termination = '\n'
+        resource = self._resourceManager.open_resource(resource_name)  # type: MessageBasedResource
+        resource.read_termination = '\n'
+        if resource_name.upper().endswith('::SOCKET'):
+            resource.write_termination = '\n'
+        self._dp832 = Session(resource, cache=StateCache(cache_ttl) if cache else None, listeners=self._listeners)
         self.instrument = Instrument(self._dp832)
         self.output = Output(self._dp832)
         self.timer = Timer(self._dp832)
         self.source = Source(self._dp832)
+        self.measure = Measure(self._dp832)
 
     def close(self):
         """ Close the resource manager session. """
         self._dp832.close()
 
+    @property
+    def cache(self) -> StateCache:
+        """ State cache of the session, with its hit and miss counters; None when it is disabled """
+        return self._dp832.cache
+
+    def batch(self, opc: bool = False, shared: bool = False):
+        """ Return a context manager that queues the commands of all subsystems and sends them on exit.
+
+        The queued commands are joined with ';' in as few messages as the input buffer of the instrument allows.
+
+        Parameters
+        ----------
+        opc : bool
+            True to wait for the instrument to complete all the commands with *OPC? after sending them
+        shared : bool
+            True to queue the commands sent by every thread, not only those of the thread that opens the batch
+        """
+        return self._dp832.batch(opc, shared)
+
+    def apply(self, profile: Profile) -> int:
+        """ Bring the instrument to the state described by a profile, sending only the settings that differ.
+
+        The present state of the channels, and of the timer when the profile has one, is read with compound
+        queries, and stored in the state cache when it is enabled, so the changes are compared against the
+        instrument and not against remembered values. The changes are then sent in one batch in a safe order:
+        outputs that must turn off are turned off first. On every channel, protections that are disabled or
+        raised are changed before the voltage and current, and protections that are enabled or lowered after
+        them, so an enabled output never trips on a setpoint that is about to change. Outputs are turned on
+        last, after the timer is programmed. The timer is reprogrammed as a whole when any of its settings
+        differs.
+
+        Parameters
+        ----------
+        profile : Profile
+            Desired state of the instrument
+        Returns
+        -------
+        int
+            Number of settings changed.
+        """
+        channels = profile.channels()
+        queries = []
+        for n in channels:
+            queries += [f':SOUR{n}:VOLT?', f':SOUR{n}:CURR?', f':OUTP:OVP:VAL? CH{n}', f':OUTP:OVP? CH{n}',
+                        f':OUTP:OCP:VAL? CH{n}', f':OUTP:OCP? CH{n}', f':OUTP:STAT? CH{n}']
+        timer = profile.timer
+        if timer is not None:
+            queries += [':TIME:STAT?', ':INST:NSEL?', ':TIME:CYCLE?', ':TIME:GROUP?', ':TIME:ENDS?',
+                        f':TIME:PARA? 0,{len(timer.points)}']
+        values = self._dp832.query_many(queries)
+        present = {}
+        for i, n in enumerate(channels):
+            voltage, current, ovp_value, ovp, ocp_value, ocp, on = values[i * 7:(i + 1) * 7]
+            present[n] = ChannelProfile(float(voltage), float(current), float(ovp_value), ovp.strip() == 'ON',
+                                        float(ocp_value), ocp.strip() == 'ON', on.strip() == 'ON')
+        reprogram = False
+        if timer is not None:
+            running, selected, cycles, groups, end_state, parameters = values[len(channels) * 7:]
+            reprogram = (int(selected) != timer.channel or int(cycles) != timer.cycles
+                         or int(groups) != len(timer.points)
+                         or (end_state.strip() == 'OFF') != timer.turn_off_when_done
+                         or not all(_same(a, b) for point, programmed in
+                                    zip(timer.points, Timer.parse_parameters(parameters))
+                                    for a, b in zip(point, programmed)))
+            timer_on = running.strip() == 'ON'
+        cache = self._dp832.cache
+        if cache is not None:
+            for n, state in present.items():
+                for key, value in ((f':SOUR{n}:VOLT', state.voltage), (f':SOUR{n}:CURR', state.current),
+                                   (f':OUTP:OVP:VAL CH{n}', state.ovp_value), (f':OUTP:OVP CH{n}', state.ovp),
+                                   (f':OUTP:OCP:VAL CH{n}', state.ocp_value), (f':OUTP:OCP CH{n}', state.ocp),
+                                   (f':OUTP:STAT CH{n}', state.on)):
+                    cache.store(key, value)
+            if timer is not None:
+                cache.store(':INST:NSEL', int(selected))
+        changes = 0
+        with self.batch():
+            for n, desired in channels.items():
+                if desired.on is False and present[n].on:
+                    self.output.turn_on(n, False)
+                    changes += 1
+            if timer is not None and timer_on and (reprogram or not timer.on):
+                self.timer.turn_on(False)
+                timer_on = False
+                changes += 1
+            for n, desired in channels.items():
+                loosen, setpoints, tighten = [], [], []
+                for setting, set_value in (('ovp_value', self.output.overvoltage_protection_value),
+                                           ('ovp', self.output.overvoltage_protection),
+                                           ('ocp_value', self.output.overcurrent_protection_value),
+                                           ('ocp', self.output.overcurrent_protection),
+                                           ('voltage', self.source.voltage),
+                                           ('current', self.source.current)):
+                    value = getattr(desired, setting)
+                    old = getattr(present[n], setting)
+                    if value is None or _same(value, old):
+                        continue
+                    if setting in ('voltage', 'current'):
+                        setpoints.append((set_value, value))
+                    elif value is False or (setting.endswith('_value') and value > old):
+                        loosen.append((set_value, value))
+                    else:
+                        tighten.append((set_value, value))
+                for set_value, value in loosen + setpoints + tighten:
+                    set_value(n, value)
+                    changes += 1
+            if reprogram:
+                self.timer.program(timer.points, timer.cycles, timer.turn_off_when_done, timer.channel, verify=False)
+                changes += 1
+            for n, desired in channels.items():
+                if desired.on and not present[n].on:
+                    self.output.turn_on(n, True)
+                    changes += 1
+            if timer is not None and timer.on and not timer_on:
+                if not reprogram:
+                    self.instrument.nselect(timer.channel)
+                self.timer.turn_on(True)
+                changes += 1
+        return changes
+
+    def add_listener(self, listener):
+        """ Register a function called after every message sent to the instrument.
+
+        The listener is called with the headers of the commands in the message joined by ';', the bytes sent,
+        the bytes received and the seconds it took. A Metrics instance can be used as listener. Nothing is timed
+        while there are no listeners.
+
+        Parameters
+        ----------
+        listener : callable
+            Function to call
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        """ Unregister a function registered with add_listener.
+
+        Parameters
+        ----------
+        listener : callable
+            Function to unregister
+        """
+        self._listeners.remove(listener)
+
     def clear(self):
         """ Send command that clears all the event registers """
         self._dp832.write('*cls')
+        if self._dp832.cache is not None:
+            self._dp832.cache.invalidate()
 
     def reset(self):
         """ Send command that restores the power supply to factory state and clears the error queue """
         self._dp832.write('*rst')
+        if self._dp832.cache is not None:
+            self._dp832.cache.invalidate()
 
     def query_id(self) -> str:
         """ Send command that queries the ID string of the instrument """
@@ -56,3 +229,32 @@ class DP832:
         """ Send command that sets the instrument to executing any other command after all the pending
         operations are completed. """
         self._dp832.write('*WAI')
+
+    def wait_complete(self, timeout: float = None) -> bool:
+        """ Wait until all the pending operations are finished.
+
+        When the interface supports service requests, the instrument is asked to request service once *OPC
+        completes and no query is sent while waiting. Otherwise the operation complete bit of the standard event
+        status register is polled, quickly at first and then less often.
+
+        Parameters
+        ----------
+        timeout : float
+            Seconds to wait; forever by default
+        Returns
+        -------
+        bool
+            True if the operations completed, False on timeout.
+        """
+        completed = Completion.wait_service_request(self._dp832, timeout)
+        if completed is not None:
+            return completed
+        self._dp832.query('*ESR?')  # Clear the operation complete bit of previous operations
+        self._dp832.write('*OPC')
+        return Completion.poll(lambda: int(self._dp832.query('*ESR?')) & 1 == 1, timeout)
+
+
+def _same(desired, present) -> bool:
+    if isinstance(desired, bool):
+        return desired == present
+    return abs(float(desired) - float(present)) < 5e-4
@@ -1,8 +1,8 @@
-from pyvisa.resources import MessageBasedResource
+from utils.Session import Session
 
 
 class Instrument:
-    def __init__(self, dp832: MessageBasedResource):
+    def __init__(self, dp832: Session):
         self._dp832 = dp832
 
     def nselect(self, channel: int):
@@ -13,7 +13,7 @@ class Instrument:
         channel : int
             The parameters 1, 2 and 3 represent CH1, CH2 and CH3 respectively.
         """
-        self._dp832.write(f':INST:NSEL {channel}')
+        self._dp832.write_setting(':INST:NSEL', channel, f':INST:NSEL {channel}')
 
     def query_nselect(self) -> int:
         """ Send command that queries the current channel
@@ -23,7 +23,7 @@ class Instrument:
         int
             Current channel in numeric form.
         """
-        return int(self._dp832.query(':INST:NSEL?'))
+        return self._dp832.query_setting(':INST:NSEL', ':INST:NSEL?', int)
 
     def select(self, channel: str):
         """ Send command to select the current channel.
@@ -34,6 +34,8 @@ class Instrument:
             Channel CH1, CH2 or CH3.
         """
         self._dp832.write(f':INST:SELE {channel}')
+        if self._dp832.cache is not None:
+            self._dp832.cache.invalidate(':INST:NSEL')
 
     def query_select(self) -> str:
         """ Send command that queries the current channel
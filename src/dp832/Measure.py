@@ -0,0 +1,69 @@
+import numpy
+
+from utils.Session import Session
+
+
+class Measure:
+    def __init__(self, dp832: Session):
+        self._dp832 = dp832
+
+    def all(self, channel: int):
+        """ Send command that queries the voltage, current and power measured on the output terminal of the
+        specified channel.
+
+        Parameters
+        ----------
+        channel : int
+            The parameters 1, 2 and 3 represent CH1, CH2 and CH3 respectively.
+        Returns
+        -------
+        tuple
+            Voltage in volts, current in amps and power in watts.
+        """
+        voltage, current, power = self._dp832.query(f':MEAS:ALL? CH{channel}').split(',')
+        return float(voltage), float(current), float(power)
+
+    def voltage(self, channel: int) -> float:
+        """ Send command that queries the voltage measured on the output terminal of the specified channel.
+
+        Parameters
+        ----------
+        channel : int
+            The parameters 1, 2 and 3 represent CH1, CH2 and CH3 respectively.
+        """
+        return float(self._dp832.query(f':MEAS:VOLT? CH{channel}'))
+
+    def current(self, channel: int) -> float:
+        """ Send command that queries the current measured on the output terminal of the specified channel.
+
+        Parameters
+        ----------
+        channel : int
+            The parameters 1, 2 and 3 represent CH1, CH2 and CH3 respectively.
+        """
+        return float(self._dp832.query(f':MEAS:CURR? CH{channel}'))
+
+    def power(self, channel: int) -> float:
+        """ Send command that queries the power measured on the output terminal of the specified channel.
+
+        Parameters
+        ----------
+        channel : int
+            The parameters 1, 2 and 3 represent CH1, CH2 and CH3 respectively.
+        """
+        return float(self._dp832.query(f':MEAS:POWE? CH{channel}'))
+
+    def channels(self, channels=(1, 2, 3)) -> numpy.ndarray:
+        """ Send :MEAS:ALL? of several channels joined in a single message and return all the measurements.
+
+        Parameters
+        ----------
+        channels : tuple of int
+            Channels to measure
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (len(channels), 3) with the voltage, current and power of every channel.
+        """
+        responses = self._dp832.query_many([f':MEAS:ALL? CH{channel}' for channel in channels])
+        return numpy.array([response.split(',') for response in responses], dtype=numpy.float64)
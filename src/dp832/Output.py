@@ -1,8 +1,8 @@
-from pyvisa.resources import MessageBasedResource
+from utils.Session import Session
 
 
 class Output:
-    def __init__(self, dp832: MessageBasedResource):
+    def __init__(self, dp832: Session):
         self._dp832 = dp832
 
     def turn_on(self, channel: int, on: bool):
@@ -19,7 +19,7 @@ class Output:
             True to turn the channel on
         """
         state = 'ON' if on else 'OFF'
-        self._dp832.write(f':OUTP:STAT CH{channel},{state}')
+        self._dp832.write_setting(f':OUTP:STAT CH{channel}', on, f':OUTP:STAT CH{channel},{state}')
 
     def query_mode(self, channel: int) -> str:
         """ Send command that queries the current output mode of the specified channel.
@@ -57,7 +57,7 @@ class Output:
             True to turn overcurrent protection on
         """
         state = 'ON' if on else 'OFF'
-        self._dp832.write(f':OUTP:OCP CH{channel},{state}')
+        self._dp832.write_setting(f':OUTP:OCP CH{channel}', on, f':OUTP:OCP CH{channel},{state}')
 
     def query_overcurrent_protection(self, channel: int) -> bool:
         """ Send command that queries the status of the overcurrent protection (OCP) function of the specified channel.
@@ -71,7 +71,8 @@ class Output:
         bool
             True if overcurrent protection is enabled
         """
-        return self._dp832.query(f':OUTP:OCP? CH{channel}') == "ON"
+        return self._dp832.query_setting(f':OUTP:OCP CH{channel}', f':OUTP:OCP? CH{channel}',
+                                         lambda state: state == "ON")
 
     def overcurrent_protection_value(self, channel: int, value: float):
         """ Send command to set the overcurrent protection value of the specified channel.
@@ -88,7 +89,7 @@ class Output:
         value: float
             Value to set
         """
-        self._dp832.write(f':OUTP:OCP:VAL CH{channel},{value}')
+        self._dp832.write_setting(f':OUTP:OCP:VAL CH{channel}', value, f':OUTP:OCP:VAL CH{channel},{value}')
 
     def overvoltage_protection(self, channel: int, on: bool):
         """ Send command to enable or disable the overvoltage protection (OVP) function of the specified channel.
@@ -106,7 +107,7 @@ class Output:
             True to turn overvoltage protection on
         """
         state = 'ON' if on else 'OFF'
-        self._dp832.write(f':OUTP:OVP CH{channel},{state}')
+        self._dp832.write_setting(f':OUTP:OVP CH{channel}', on, f':OUTP:OVP CH{channel},{state}')
 
     def query_overvoltage_protection(self, channel: int) -> bool:
         """ Send command that queries the overvoltage protection (OVP) function of the specified channel.
@@ -120,7 +121,8 @@ class Output:
         bool
             True if overvoltage protection is enabled
         """
-        return self._dp832.query(f':OUTP:OVP? CH{channel}') == "ON"
+        return self._dp832.query_setting(f':OUTP:OVP CH{channel}', f':OUTP:OVP? CH{channel}',
+                                         lambda state: state == "ON")
 
     def overvoltage_protection_value(self, channel: int, value: float):
         """ Send command to set the overvoltage protection (OVP) value of the specified channel.
@@ -137,5 +139,5 @@ class Output:
         value: float
             Value to set
         """
-        self._dp832.write(f':OUTP:OVP:VAL CH{channel},{value}')
+        self._dp832.write_setting(f':OUTP:OVP:VAL CH{channel}', value, f':OUTP:OVP:VAL CH{channel},{value}')
 
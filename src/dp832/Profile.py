@@ -0,0 +1,39 @@
+from typing import NamedTuple
+
+
+class ChannelProfile(NamedTuple):
+    """ Desired settings of one channel. Settings left as None are not changed. """
+    voltage: float = None
+    current: float = None
+    ovp_value: float = None
+    ovp: bool = None
+    ocp_value: float = None
+    ocp: bool = None
+    on: bool = None
+
+
+class TimerProfile(NamedTuple):
+    """ Desired timer program of one channel. Every point is a (voltage, current, seconds) tuple. """
+    channel: int
+    points: tuple
+    cycles: int = 1
+    turn_off_when_done: bool = True
+    on: bool = True
+
+
+class Profile(NamedTuple):
+    """ Desired state of the three channels and the timer of a DP832, applied with DP832.apply.
+
+    Examples
+    --------
+    >>> fixture = Profile(channel1=ChannelProfile(voltage=4.2, current=2, ovp_value=4.9, ovp=True, on=True),
+    ...                   timer=TimerProfile(1, ((4.2, 2, 45), (3.8, 2, 45))))
+    >>> dp832.apply(fixture)
+    """
+    channel1: ChannelProfile = ChannelProfile()
+    channel2: ChannelProfile = ChannelProfile()
+    channel3: ChannelProfile = ChannelProfile()
+    timer: TimerProfile = None
+
+    def channels(self) -> dict:
+        return {1: self.channel1, 2: self.channel2, 3: self.channel3}
@@ -1,8 +1,8 @@
-from pyvisa.resources import MessageBasedResource
+from utils.Session import Session
 
 
 class Source:
-    def __init__(self, dp832: MessageBasedResource):
+    def __init__(self, dp832: Session):
         self._dp832 = dp832
 
     def current(self, channel: int, value: float):
@@ -15,7 +15,7 @@ class Source:
         value : float
             Value to set
         """
-        self._dp832.write(f':SOUR{channel}:CURR {value}')
+        self._dp832.write_setting(f':SOUR{channel}:CURR', value, f':SOUR{channel}:CURR {value}')
 
     def voltage(self, channel: int, value: float):
         """ Send command to set the voltage of the specified channel.
@@ -27,6 +27,6 @@ class Source:
         value : float
             Value to set
         """
-        self._dp832.write(f':SOUR{channel}:VOLT {value}')
+        self._dp832.write_setting(f':SOUR{channel}:VOLT', value, f':SOUR{channel}:VOLT {value}')
 
 
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import NamedTuple
+
+import numpy
+
+from dp832.Measure import Measure
+
+
+class TelemetrySnapshot(NamedTuple):
+    time: numpy.ndarray  # Seconds since the poller started, one per poll
+    voltage: numpy.ndarray  # Volts, one row per poll and one column per channel
+    current: numpy.ndarray  # Amps, one row per poll and one column per channel
+    power: numpy.ndarray  # Watts, one row per poll and one column per channel
+
+
+class Telemetry:
+    """ Background poller of the voltage, current and power of several DP832 channels.
+
+    A thread measures all the channels with one message per poll, rate times per second, and stores them in a
+    ring buffer that keeps the last capacity polls. Polls that cannot keep up with the rate are skipped and
+    counted in overruns. Snapshots copy the buffer without locking, so reading never delays the poller; rows
+    overwritten during the copy are left out of the snapshot. The session can be used by other threads while
+    the poller runs.
+
+    Parameters
+    ----------
+    measure : Measure
+        Measure subsystem of the DP832
+    channels : tuple of int
+        Channels to measure
+    rate : float
+        Polls per second
+    capacity : int
+        Number of polls kept
+
+    Examples
+    --------
+    >>> with Telemetry(dp832.measure, rate=20) as telemetry:
+    ...     dp832.timer.turn_on(True)
+    ...     time.sleep(10)
+    >>> snapshot = telemetry.snapshot()
+    >>> snapshot.current[:, 0].max()
+    """
+
+    def __init__(self, measure: Measure, channels=(1, 2, 3), rate: float = 10.0, capacity: int = 10000):
+        self.channels = tuple(channels)
+        self.rate = rate
+        self.capacity = capacity
+        self.overruns = 0
+        self.error = None
+        self._measure = measure
+        self._times = numpy.zeros(capacity)
+        self._values = numpy.zeros((capacity, len(self.channels), 3))
+        self._count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'Telemetry':
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def running(self) -> bool:
+        """ True while the poller thread runs """
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """ Clear the buffer and start polling in a background thread. """
+        if self.running:
+            raise RuntimeError("Telemetry is already running")
+        self._count = 0
+        self.overruns = 0
+        self.error = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="DP832 telemetry", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop polling and wait for the thread to end. Raises the error that stopped the poller, if any. """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def snapshot(self, last: int = None) -> TelemetrySnapshot:
+        """ Return a copy of the polls in the buffer, oldest first.
+
+        Parameters
+        ----------
+        last : int
+            Number of most recent polls to return; all the polls in the buffer by default
+        """
+        count = self._count
+        size = min(count, self.capacity) if last is None else min(count, self.capacity, last)
+        polls = numpy.arange(count - size, count)
+        times = self._times[polls % self.capacity]
+        values = self._values[polls % self.capacity]
+        # The poller may have overwritten the oldest rows, and be writing the next one, during the copy
+        valid = polls > self._count - self.capacity
+        times, values = times[valid], values[valid]
+        return TelemetrySnapshot(times, values[:, :, 0], values[:, :, 1], values[:, :, 2])
+
+    def latest(self) -> TelemetrySnapshot:
+        """ Return the most recent poll, with one value per channel, or None before the first poll. """
+        snapshot = self.snapshot(1)
+        if not len(snapshot.time):
+            return None
+        return TelemetrySnapshot(*(column[0] for column in snapshot))
+
+    def _poll(self):
+        period = 1.0 / self.rate
+        start = time.monotonic()
+        deadline = start
+        while not self._stop.is_set():
+            before = time.monotonic()
+            try:
+                values = self._measure.channels(self.channels)
+            except Exception as err:
+                self.error = err
+                return
+            after = time.monotonic()
+            index = self._count % self.capacity
+            self._times[index] = (before + after) / 2 - start
+            self._values[index] = values
+            self._count += 1
+            deadline += period
+            if deadline < after:
+                skipped = int((after - deadline) / period) + 1
+                self.overruns += skipped
+                deadline += skipped * period
+            self._stop.wait(deadline - time.monotonic())
@@ -1,9 +1,17 @@
-from pyvisa.resources import MessageBasedResource
+import numpy
+
+from dp832.Instrument import Instrument
+from utils.Session import Session
+
+# Maximum voltage and current that can be set on each channel
+_LIMITS = {1: (32.0, 3.2), 2: (32.0, 3.2), 3: (5.3, 3.2)}
+_MAX_GROUPS = 2048
 
 
 class Timer:
-    def __init__(self, dp832: MessageBasedResource):
+    def __init__(self, dp832: Session):
         self._dp832 = dp832
+        self._instrument = Instrument(dp832)
 
     def cycles(self, number: int):
         """ Send command to set the number of cycles of the timer.
@@ -68,3 +76,94 @@ class Timer:
         """
         state = 'ON' if on else 'OFF'
         self._dp832.write(f':TIME:STAT {state}')
+        if self._dp832.cache is not None:
+            # The timer drives the settings and the output state of the selected channel
+            self._dp832.cache.invalidate(':SOUR')
+            self._dp832.cache.invalidate(':OUTP:STAT')
+
+    def query_parameters(self, first: int, count: int) -> list:
+        """
+        Query the timer parameters of several consecutive groups in one round trip
+
+        Parameters
+        ----------
+         first : int
+            Number of the first group. Starts at 0
+        count : int
+            Number of groups to query
+        Returns
+        -------
+        list
+            (voltage, current, seconds) tuple of every group.
+        """
+        return self.parse_parameters(self._dp832.query(f':TIME:PARA? {first},{count}'))
+
+    @staticmethod
+    def parse_parameters(response: str) -> list:
+        """ Return the (voltage, current, seconds) tuple of every group in a response to :TIME:PARA? """
+        values = response.split(',')
+        return [(float(values[i + 1]), float(values[i + 2]), float(values[i + 3])) for i in range(0, len(values), 4)]
+
+    def program(self, points, cycles: int, turn_off_when_done: bool, channel: int = None, verify: bool = True):
+        """
+        Upload a whole timer program and check it was stored. The timer of the channel is turned off first.
+
+        The points are validated against the limits of the channel before anything is sent, and all the
+        commands are sent joined in as few messages as the input buffer allows. With verify, the groups are
+        read back with a single query and compared with the points.
+
+        Parameters
+        ----------
+        points : list of tuple or numpy.ndarray
+            (voltage, current, seconds) of every group, in order
+        cycles : int
+            Number of cycles of the timer
+        turn_off_when_done : bool
+            True to turn the output off when the timer is done, False to keep the last group
+        channel : int
+            Channel the timer will run on; the selected channel by default
+        verify : bool
+            True to read back the program and raise RuntimeError if it differs
+        """
+        table = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        if channel is None:
+            channel = self._instrument.query_nselect()
+        max_voltage, max_current = _LIMITS[channel]
+        if not 1 <= len(table) <= _MAX_GROUPS:
+            raise ValueError(f"Timer programs have 1 to {_MAX_GROUPS} groups, not {len(table)}")
+        for group, (voltage, current, seconds) in enumerate(table):
+            if not (0 <= voltage <= max_voltage and 0 <= current <= max_current and 1 <= seconds <= 99999):
+                raise ValueError(f"Group {group} ({voltage} V, {current} A, {seconds} s) is out of the limits of "
+                                 f"CH{channel} ({max_voltage} V, {max_current} A, 1 to 99999 s)")
+        with self._dp832.batch():
+            self._instrument.nselect(channel)
+            self.turn_on(False)
+            self.cycles(cycles)
+            self.groups(len(table))
+            for group, (voltage, current, seconds) in enumerate(table):
+                self.parameter(group, f'{voltage:g}', f'{current:g}', f'{seconds:g}')
+            self.turn_off_when_done(turn_off_when_done)
+        if verify:
+            self.verify(table, cycles)
+
+    def verify(self, points, cycles: int):
+        """
+        Read back the timer program in one round trip and raise RuntimeError if it differs from the points
+
+        Parameters
+        ----------
+        points : list of tuple or numpy.ndarray
+            (voltage, current, seconds) of every group, in order
+        cycles : int
+            Number of cycles of the timer
+        """
+        table = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        stored_cycles, stored_groups, parameters = self._dp832.query_many(
+            [':TIME:CYCLE?', ':TIME:GROUP?', f':TIME:PARA? 0,{len(table)}'])
+        if int(stored_cycles) != cycles or int(stored_groups) != len(table):
+            raise RuntimeError(f"Timer has {stored_groups} groups and {stored_cycles} cycles instead of "
+                               f"{len(table)} and {cycles}")
+        stored = numpy.array(self.parse_parameters(parameters))
+        different = numpy.flatnonzero(~numpy.isclose(stored, table, rtol=0, atol=1e-3).all(axis=1))
+        if len(different):
+            raise RuntimeError(f"Timer groups {different.tolist()} differ from the program")
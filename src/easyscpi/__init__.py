@@ -0,0 +1,57 @@
+""" Lightweight entry point to the instruments, enums and helpers of EasySCPI.
+
+Importing this package loads nothing else; every name is imported from its module the first time it is used,
+so analysis scripts that only need enums or units start without loading pyvisa or the instrument drivers.
+
+Examples
+--------
+>>> import easyscpi
+>>> easyscpi.Element.READING  # Imports dmm6500.Trace only
+>>> dmm = easyscpi.DMM6500(pyvisa.ResourceManager())
+"""
+import importlib
+
+_MODULES = {
+    'DMM6500': 'dmm6500.DMM6500',
+    'AsyncDMM6500': 'dmm6500.AsyncDMM6500',
+    'Element': 'dmm6500.Trace',
+    'Format': 'dmm6500.Trace',
+    'Statistics': 'dmm6500.Trace',
+    'TraceStore': 'dmm6500.TraceStore',
+    'FetchPlanner': 'dmm6500.FetchPlanner',
+    'PingPong': 'dmm6500.PingPong',
+    'State': 'dmm6500.Trigger',
+    'Function': 'dmm6500.Sense',
+    'DigitizeFunction': 'dmm6500.Sense',
+    'Range': 'dmm6500.Sense',
+    'DP832': 'dp832.DP832',
+    'AsyncDP832': 'dp832.AsyncDP832',
+    'Profile': 'dp832.Profile',
+    'ChannelProfile': 'dp832.Profile',
+    'TimerProfile': 'dp832.Profile',
+    'Telemetry': 'dp832.Telemetry',
+    'VoltUnit': 'utils.Units',
+    'CurrentUnit': 'utils.Units',
+    'Metrics': 'utils.Metrics',
+    'Group': 'utils.Group',
+    'SessionPool': 'utils.SessionPool',
+    'SocketResourceManager': 'utils.SocketResourceManager',
+    'SimulatedResourceManager': 'simulator.SimulatedResourceManager',
+    'SimulatedDMM6500': 'simulator.SimulatedDMM6500',
+    'SimulatedDP832': 'simulator.SimulatedDP832',
+    'SimulatedServer': 'simulator.SimulatedServer',
+}
+
+__all__ = sorted(_MODULES)
+
+
+def __getattr__(name):
+    if name not in _MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_MODULES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_MODULES))
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import deque
+
+
+class Model:
+    """ SCPI state machine of a simulated instrument.
+
+    Commands are registered with their header in SCPI notation, e.g. 'TRACe:ACTual:END?', so both the short
+    and the long form of every node are accepted in any case. A node ending with '#' takes a numeric suffix,
+    e.g. 'SOURce#:VOLTage', which is passed to the handler before the parameters. Handlers of queries return
+    the response as str, or bytes for binary blocks. Commands that fail are added to the error queue and get
+    no response, like on the real instruments.
+    """
+
+    IDN = "EasySCPI,Simulator,0,0"
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._commands = []
+        self._errors = deque()
+        self._hold_until = 0.0
+        self.esr = 0
+        self._opc_pending = False
+        self.command("*IDN?", lambda: self.IDN)
+        self.command("*RST", self.reset)
+        self.command("*CLS", self.clear)
+        self.command("*WAI", self._wait)
+        self.command("*OPC", self._opc)
+        self.command("*OPC?", self._opc_query)
+        self.command("*ESR?", self._esr_query)
+        self.command("SYSTem:ERRor?", self._error)
+        self.command("SYSTem:ERRor:NEXT?", self._error)
+
+    def command(self, header: str, handler):
+        """ Register the handler of a command or query.
+
+        Parameters
+        ----------
+        header : str
+            Header in SCPI notation, ending with '?' for queries
+        handler : callable
+            Function called with the numeric suffixes and the parameters of the command
+        """
+        query = header.endswith("?")
+        nodes = []
+        for node in header.rstrip("?").lstrip(":").split(":"):
+            numbered = node.endswith("#")
+            node = node.rstrip("#")
+            nodes.append((node.upper(), "".join(c for c in node if not c.islower()), numbered))
+        self._commands.append((nodes, query, handler))
+
+    def reset(self):
+        """ Restore the default settings. """
+        self.clear()
+
+    def clear(self):
+        """ Clear the event registers and the error queue. """
+        self._errors.clear()
+        self.esr = 0
+        self._opc_pending = False
+
+    def busy_until(self) -> float:
+        """ Return the monotonic time when the pending overlapped operations finish; 0 if there are none. """
+        return 0.0
+
+    def advance(self):
+        """ Bring the state of the model up to the present time. """
+
+    def error(self, code: int, message: str):
+        self._errors.append(f'{code},"{message}"')
+
+    def execute(self, message: str):
+        """ Execute a program message and return the response of its queries joined by ';', or None.
+
+        Parameters
+        ----------
+        message : str
+            One or several commands separated by ';'
+        """
+        with self._lock:
+            responses = []
+            for command in _split(message.strip(), ";"):
+                if not command.strip():
+                    continue
+                hold = self._hold_until - time.monotonic()
+                if hold > 0:
+                    time.sleep(hold)
+                self._update()
+                try:
+                    response = self._dispatch(command.strip())
+                except Exception as err:
+                    self.error(-200, f"Execution error; {err}")
+                    continue
+                if response is not None:
+                    responses.append(response.encode("latin_1") if isinstance(response, str) else response)
+            self._update()
+            return b";".join(responses) if responses else None
+
+    def _update(self):
+        self.advance()
+        if self._opc_pending and self.busy_until() <= time.monotonic():
+            self._opc_pending = False
+            self.esr |= 1
+
+    def _dispatch(self, command: str):
+        header, _, rest = command.partition(" ")
+        query = header.endswith("?")
+        nodes = header.rstrip("?").lstrip(":").upper().split(":")
+        params = [_unquote(param.strip()) for param in _split(rest, ",")] if rest.strip() else []
+        for pattern, is_query, handler in self._commands:
+            if is_query != query or len(pattern) != len(nodes):
+                continue
+            suffixes = _match(pattern, nodes)
+            if suffixes is not None:
+                response = handler(*suffixes, *params)
+                return response if query else None
+        return self.undefined(nodes, query, params)
+
+    def undefined(self, nodes, query: bool, params):
+        """ Handle a command that has no handler registered. """
+        self.error(-113, "Undefined header")
+
+    def _wait(self):
+        self._hold_until = self.busy_until()
+
+    def _opc(self):
+        self._opc_pending = True
+
+    def _opc_query(self):
+        hold = self.busy_until() - time.monotonic()
+        if hold > 0:
+            time.sleep(hold)
+            self.advance()
+        return "1"
+
+    def _esr_query(self):
+        esr, self.esr = self.esr, 0
+        return str(esr)
+
+    def _error(self):
+        return self._errors.popleft() if self._errors else '0,"No error"'
+
+
+def _split(text: str, separator: str):
+    parts = []
+    quoted = False
+    start = 0
+    for i, c in enumerate(text):
+        if c == '"':
+            quoted = not quoted
+        elif c == separator and not quoted:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _unquote(param: str) -> str:
+    if len(param) >= 2 and param[0] == param[-1] and param[0] in "\"'":
+        return param[1:-1]
+    return param
+
+
+def _match(pattern, nodes):
+    suffixes = []
+    for (long, short, numbered), node in zip(pattern, nodes):
+        if numbered:
+            stripped = node.rstrip("0123456789")
+            suffixes.append(int(node[len(stripped):] or 1))
+            node = stripped
+        if node != long and node != short:
+            return None
+    return suffixes
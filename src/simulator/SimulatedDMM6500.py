@@ -0,0 +1,386 @@
+import math
+import time
+
+import numpy
+
+from simulator.Model import Model
+from utils import Block
+
+_UNITS = {"VOLT": "V", "CURR": "A", "RES": "Ohm", "DIOD": "V", "CAP": "F", "TEMP": "C", "CONT": "Ohm"}
+
+
+class Buffer:
+    """ Reading buffer of the simulated DMM6500.
+
+    Readings are stored in circular arrays. A buffer that fills once stops storing readings when it is full, and
+    one that fills continuously overwrites the oldest readings. Statistics include overwritten readings.
+    """
+
+    def __init__(self, capacity: int, continuous: bool):
+        self.continuous = continuous
+        self.resize(capacity)
+
+    def resize(self, capacity: int):
+        self.capacity = capacity
+        self.readings = numpy.zeros(capacity)
+        self.relative = numpy.zeros(capacity)
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self.start_ns = time.time_ns()
+        self.stats_clear()
+
+    def stats_clear(self):
+        self.stats_count = 0
+        self.stats_sum = 0.0
+        self.stats_sum_squares = 0.0
+        self.stats_min = math.inf
+        self.stats_max = -math.inf
+
+    def count(self) -> int:
+        return min(self.total, self.capacity)
+
+    def start_index(self) -> int:
+        if self.total == 0:
+            return 0
+        return 1 if self.total <= self.capacity else self.total % self.capacity + 1
+
+    def end_index(self) -> int:
+        return 0 if self.total == 0 else (self.total - 1) % self.capacity + 1
+
+    def append(self, readings: numpy.ndarray, relative: numpy.ndarray):
+        if not self.continuous:
+            readings = readings[:self.capacity - self.total]
+            relative = relative[:self.capacity - self.total]
+        if len(readings) == 0:
+            return
+        self.stats_count += len(readings)
+        self.stats_sum += float(readings.sum())
+        self.stats_sum_squares += float(numpy.square(readings).sum())
+        self.stats_min = min(self.stats_min, float(readings.min()))
+        self.stats_max = max(self.stats_max, float(readings.max()))
+        skipped = max(len(readings) - self.capacity, 0)
+        readings, relative = readings[skipped:], relative[skipped:]
+        self.total += skipped
+        position = self.total % self.capacity
+        first = min(len(readings), self.capacity - position)
+        self.readings[position:position + first] = readings[:first]
+        self.relative[position:position + first] = relative[:first]
+        self.readings[:len(readings) - first] = readings[first:]
+        self.relative[:len(readings) - first] = relative[first:]
+        self.total += len(readings)
+
+
+class SimulatedDMM6500(Model):
+    """ SCPI model of a Keithley DMM6500 digital multimeter.
+
+    Readings are produced by the DurationLoop and SimpleLoop trigger-model templates at reading_rate readings
+    per second of real time, or at the sample rate when a digitize function is active, and the value of each
+    reading is given by signal, a function of the relative time in seconds. Long NPLC settings, autozero and the
+    repeating filter slow the reading rate down as on the instrument. Trigger models built from buffer clear,
+    measure and branch blocks run the same way. Use load to fill a buffer instantly.
+
+    Parameters
+    ----------
+    reading_rate : float
+        Readings per second made by the trigger model
+    signal : callable
+        Function that returns the readings for an array of relative times
+    noise : float
+        Standard deviation of the gaussian noise added to the readings
+    capacity : int
+        Capacity of the default buffers
+    """
+
+    IDN = "KEITHLEY INSTRUMENTS,MODEL DMM6500,04412345,1.7.12b"
+
+    block_time = 20e-6  # Seconds taken by trigger-model blocks that do not measure
+
+    def __init__(self, reading_rate: float = 1000.0, signal=None, noise: float = 1e-4, capacity: int = 100000):
+        super().__init__()
+        self.reading_rate = reading_rate
+        self.signal = signal or (lambda t: 3.3 + 0.01 * numpy.sin(2 * numpy.pi * 50 * t))
+        self.noise = noise
+        self.default_capacity = capacity
+        self._random = numpy.random.default_rng(0)
+        self.command("SENSe:FUNCtion", self._function)
+        self.command("SENSe:FUNCtion?", lambda: '"NONE"' if self.digitize else f'"{self.function}"')
+        self.command("SENSe:DIGitize:FUNCtion", self._digitize_function)
+        self.command("SENSe:DIGitize:FUNCtion?", lambda: f'"{self.digitize or "NONE"}"')
+        self.command("SENSe:DIGitize:VOLTage:SRATe", lambda rate: self._sample_rate("VOLT", rate))
+        self.command("SENSe:DIGitize:VOLTage:SRATe?", lambda: str(self.sample_rates["VOLT"]))
+        self.command("SENSe:DIGitize:CURRent:SRATe", lambda rate: self._sample_rate("CURR", rate))
+        self.command("SENSe:DIGitize:CURRent:SRATe?", lambda: str(self.sample_rates["CURR"]))
+        self.command("SENSe:DIGitize:COUNt", lambda count: setattr(self, "digitize_count", int(count)))
+        self.command("SENSe:DIGitize:COUNt?", lambda: str(self.digitize_count))
+        self.command("FORMat:DATA", self._format)
+        self.command("FORMat", self._format)
+        self.command("FORMat:DATA?", lambda: self.data_format)
+        self.command("FORMat?", lambda: self.data_format)
+        self.command("FORMat:BORDer", self._border)
+        self.command("FORMat:BORDer?", lambda: self.byte_order)
+        self.command("TRACe:MAKE", self._make)
+        self.command("TRACe:DELete", lambda name: self.buffers.pop(name))
+        self.command("TRACe:CLEar", lambda name="defbuffer1": self.buffers[name].clear())
+        self.command("TRACe:POINts", lambda size, name="defbuffer1": self.buffers[name].resize(int(size)))
+        self.command("TRACe:POINts?", lambda name="defbuffer1": str(self.buffers[name].capacity))
+        self.command("TRACe:FILL:MODE", self._fill_mode)
+        self.command("TRACe:ACTual?", lambda name="defbuffer1": str(self.buffers[name].count()))
+        self.command("TRACe:ACTual:STARt?", lambda name="defbuffer1": str(self.buffers[name].start_index()))
+        self.command("TRACe:ACTual:END?", lambda name="defbuffer1": str(self.buffers[name].end_index()))
+        self.command("TRACe:DATA?", self._data)
+        self.command("TRACe:STATistics:CLEar", lambda name="defbuffer1": self.buffers[name].stats_clear())
+        self.command("TRACe:STATistics:AVERage?", lambda name="defbuffer1": self._stat(name, "average"))
+        self.command("TRACe:STATistics:MAXimum?", lambda name="defbuffer1": self._stat(name, "maximum"))
+        self.command("TRACe:STATistics:MINimum?", lambda name="defbuffer1": self._stat(name, "minimum"))
+        self.command("TRACe:STATistics:PK2Pk?", lambda name="defbuffer1": self._stat(name, "peak_to_peak"))
+        self.command("TRACe:STATistics:STDDev?", lambda name="defbuffer1": self._stat(name, "std_dev"))
+        self.command("TRIGger:LOAD", self._load)
+        self.command("TRIGger:STATe?", self._state)
+        self.command("TRIGger:BLOCk:BUFFer:CLEar", lambda block, name="defbuffer1": self._block(block, "CLEAR", name))
+        self.command("TRIGger:BLOCk:MDIGitize", lambda block, name="defbuffer1", count="1":
+                     self._block(block, "MEASURE", name, int(count)))
+        self.command("TRIGger:BLOCk:BRANch:ALWays", lambda block, target: self._block(block, "BRANCH", int(target)))
+        self.command("TRIGger:BLOCk:LIST?", self._block_list)
+        self.command("INITiate", self._init)
+        self.command("INITiate:IMMediate", self._init)
+        self.command("ABORt", self._abort)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.function = "VOLT:DC"
+        self.digitize = None
+        self.sample_rates = {"VOLT": 1000000, "CURR": 1000000}
+        self.digitize_count = 1
+        self.data_format = "ASC"
+        self.byte_order = "SWAP"
+        self.settings = {}
+        self.buffers = {"defbuffer1": Buffer(self.default_capacity, True),
+                        "defbuffer2": Buffer(self.default_capacity, True)}
+        self.template = None
+        self.blocks = {}
+        self.run = None
+
+    def load(self, buffer: str, readings, relative=None):
+        """ Store readings in a buffer instantly, as if the trigger model had measured them.
+
+        Parameters
+        ----------
+        buffer : str
+            Name of the buffer
+        readings : array_like
+            Readings to store
+        relative : array_like
+            Relative time of each reading; spaced by the reading rate by default
+        """
+        readings = numpy.asarray(readings, dtype=numpy.float64)
+        if relative is None:
+            relative = numpy.arange(len(readings)) / self.reading_rate
+        with self._lock:
+            self.buffers[buffer].append(readings, numpy.asarray(relative, dtype=numpy.float64))
+
+    def busy_until(self) -> float:
+        # A trigger model built from blocks may loop forever, so its end is not known in advance
+        return self.run["end"] if self.run is not None and "blocks" not in self.run else 0.0
+
+    def advance(self):
+        run = self.run
+        if run is None:
+            return
+        now = time.monotonic()
+        if "blocks" in run:
+            self._advance_blocks(run, now - run["start"])
+            return
+        due = min(int((now - run["start"]) / run["period"]) + 1, run["count"])
+        if due > run["made"]:
+            relative = numpy.arange(run["made"], due) * run["period"] + run["delay"]
+            readings = self.signal(relative) + self._random.normal(0.0, self.noise, len(relative))
+            self.buffers[run["buffer"]].append(readings, relative)
+            run["made"] = due
+        if run["made"] >= run["count"] and now >= run["end"]:
+            self.run = None
+
+    def _advance_blocks(self, run, elapsed: float):
+        # The cursor is the time of the next block; blocks other than measure blocks take block_time
+        while run["cursor"] <= elapsed:
+            block = self.blocks.get(run["block"])
+            if block is None:
+                self.run = None
+                return
+            kind, *params = block
+            if kind == "CLEAR":
+                self.buffers[params[0]].clear()
+                self.buffers[params[0]].start_ns = run["start_ns"]
+                run["block"] += 1
+                run["cursor"] += self.block_time
+            elif kind == "BRANCH":
+                run["block"] = params[0]
+                run["cursor"] += self.block_time
+            else:
+                name, count = params
+                remaining = count - run["made"]
+                due = min(remaining, int((elapsed - run["cursor"]) / run["period"]) + 1)
+                relative = run["cursor"] + numpy.arange(due) * run["period"]
+                readings = self.signal(relative) + self._random.normal(0.0, self.noise, due)
+                self.buffers[name].append(readings, relative)
+                run["cursor"] += due * run["period"]
+                run["made"] += due
+                if run["made"] < count:
+                    return
+                run["made"] = 0
+                run["block"] += 1
+
+    def undefined(self, nodes, query: bool, params):
+        if nodes[0] not in ("SENS", "SENSE"):
+            return super().undefined(nodes, query, params)
+        key = ":".join(nodes)
+        if query:
+            return ",".join(self.settings.get(key, ["0"]))
+        self.settings[key] = params
+
+    def _function(self, function: str):
+        self.function = function.upper()
+        self.digitize = None
+
+    def _measure_period(self) -> float:
+        # Integration time of 60 Hz power line cycles, doubled by autozero and multiplied by a repeating filter
+        period = 1.0 / self.reading_rate
+        nplc = self.settings.get(f"SENS:{self.function}:NPLC")
+        if nplc:
+            auto_zero = self.settings.get(f"SENS:{self.function}:AZER", ["ON"])[0].upper() in ("ON", "1")
+            period = max(period, float(nplc[0]) / 60.0 * (2 if auto_zero else 1))
+        if self.settings.get(f"SENS:{self.function}:AVER", ["OFF"])[0].upper() in ("ON", "1"):
+            period *= int(self.settings.get(f"SENS:{self.function}:AVER:COUN", ["10"])[0])
+        return period
+
+    def _digitize_function(self, function: str):
+        function = function.upper()[:4]
+        self.digitize = None if function == "NONE" else function
+
+    def _sample_rate(self, function: str, rate: str):
+        rate = int(float(rate))
+        if not 1000 <= rate <= 1000000:
+            raise ValueError("Parameter, sample rate out of range")
+        self.sample_rates[function] = rate
+
+    def _format(self, data_format: str, *_):
+        data_format = data_format.upper()
+        self.data_format = "ASC" if data_format.startswith("ASC") else "SRE" if data_format.startswith("SRE") \
+            else "REAL"
+
+    def _border(self, byte_order: str):
+        self.byte_order = "NORM" if byte_order.upper().startswith("NORM") else "SWAP"
+
+    def _make(self, name: str, size: str, *_):
+        if name in self.buffers:
+            raise ValueError("TRACe:MAKE cannot take an existing reading buffer name")
+        self.buffers[name] = Buffer(int(size) or self.default_capacity, False)
+
+    def _fill_mode(self, mode: str, name: str = "defbuffer1"):
+        self.buffers[name].continuous = mode.upper().startswith("CONT")
+
+    def _stat(self, name: str, statistic: str) -> str:
+        buffer = self.buffers[name]
+        if buffer.stats_count == 0:
+            return "9.9E+37"
+        average = buffer.stats_sum / buffer.stats_count
+        if statistic == "average":
+            value = average
+        elif statistic == "maximum":
+            value = buffer.stats_max
+        elif statistic == "minimum":
+            value = buffer.stats_min
+        elif statistic == "peak_to_peak":
+            value = buffer.stats_max - buffer.stats_min
+        else:
+            variance = (buffer.stats_sum_squares - buffer.stats_count * average ** 2) / max(buffer.stats_count - 1, 1)
+            value = math.sqrt(max(variance, 0.0))
+        return f"{value:.9E}"
+
+    def _data(self, start: str, end: str, name: str = "defbuffer1", *elements):
+        buffer = self.buffers[name]
+        start, end = int(start), int(end)
+        if not 1 <= start <= end <= buffer.capacity:
+            raise ValueError("Index out of range")
+        elements = [element.upper()[:4] for element in elements] or ["READ"]
+        columns = []
+        for element in elements:
+            if element.startswith("REL"):
+                columns.append(buffer.relative[start - 1:end])
+            elif element.startswith("READ"):
+                columns.append(buffer.readings[start - 1:end])
+            elif self.data_format != "ASC":
+                raise ValueError("Parameter 4, Syntax error, expected valid name parameters")
+            elif element.startswith("TST"):
+                columns.append(_timestamps(buffer.start_ns, buffer.relative[start - 1:end]))
+            elif element.startswith("FORM"):
+                unit = _UNITS.get(self.function.split(":")[0], "")
+                columns.append(numpy.char.add(numpy.char.mod("%+.6f ", buffer.readings[start - 1:end]), unit))
+            else:
+                raise ValueError(f"Unknown element {element}")
+        if self.data_format != "ASC":
+            dtype = ("<" if self.byte_order == "SWAP" else ">") + ("f4" if self.data_format == "SRE" else "f8")
+            return Block.encode(numpy.column_stack(columns).astype(dtype).tobytes())
+        columns = [column if column.dtype.kind in "SU" else numpy.char.mod("%.9E", column) for column in columns]
+        return ",".join(numpy.column_stack(columns).ravel().tolist())
+
+    def _load(self, template: str, *params):
+        self.blocks = {}
+        if template.upper() == "EMPTY":
+            self.template = None
+        elif template.upper() in ("DURATIONLOOP", "SIMPLELOOP"):
+            self.template = (template.upper(), params)
+        else:
+            raise ValueError(f"Unknown template {template}")
+
+    def _block(self, block: str, kind: str, *params):
+        if self.template is not None:
+            raise ValueError("Trigger model blocks need an empty trigger model")
+        self.blocks[int(block)] = (kind, *params)
+
+    def _block_list(self) -> str:
+        return ";".join(f"{block},{kind}," + ",".join(map(str, params))
+                        for block, (kind, *params) in sorted(self.blocks.items()))
+
+    def _init(self):
+        if self.template is None and self.blocks:
+            period = 1.0 / self.sample_rates[self.digitize] if self.digitize else self._measure_period()
+            self.run = {"blocks": True, "start": time.monotonic(), "start_ns": time.time_ns(), "period": period,
+                        "block": 1, "cursor": 0.0, "made": 0}
+            return
+        if self.template is None:
+            return
+        template, params = self.template
+        delay = float(params[1]) if len(params) > 1 else 0.0
+        buffer = params[2] if len(params) > 2 else "defbuffer1"
+        if self.digitize is None:
+            period = delay + self._measure_period()
+            count = int(float(params[0]) / period) if template == "DURATIONLOOP" else int(params[0])
+        else:
+            # Every measure block makes the digitize count of readings at the sample rate
+            period = 1.0 / self.sample_rates[self.digitize]
+            count = int(float(params[0]) / period) if template == "DURATIONLOOP" \
+                else int(params[0]) * self.digitize_count
+        start = time.monotonic()
+        self.run = {"buffer": buffer, "start": start, "end": start + count * period, "period": period,
+                    "delay": delay, "count": count, "made": 0}
+
+    def _abort(self):
+        self.run = None
+
+    def _state(self) -> str:
+        if self.run is not None:
+            return "RUNNING;RUNNING;1"
+        return "IDLE;IDLE;0" if self.template is not None or self.blocks else "EMPTY;EMPTY;0"
+
+
+def _timestamps(start_ns: int, relative: numpy.ndarray) -> numpy.ndarray:
+    times = numpy.datetime64(start_ns, "ns") + (relative * 1e9).astype("timedelta64[ns]")
+    iso = numpy.datetime_as_string(times, unit="ns").astype("S29").view(numpy.uint8).reshape(-1, 29)
+    # YYYY-MM-DDThh:mm:ss.fffffffff to MM/DD/YYYY hh:mm:ss.fffffffff
+    stamps = iso[:, [5, 6, 4, 8, 9, 7, 0, 1, 2, 3, 10] + list(range(11, 29))].copy()
+    stamps[:, [2, 5]] = ord("/")
+    stamps[:, 10] = ord(" ")
+    return stamps.view("S29").ravel().astype(str)
@@ -0,0 +1,179 @@
+import time
+
+from simulator.Model import Model
+
+_LIMITS = {1: (30.0, 3.0), 2: (30.0, 3.0), 3: (5.0, 3.0)}
+
+
+class Channel:
+    """ Output channel of the simulated DP832 with a resistive load connected. """
+
+    def __init__(self, number: int, load: float):
+        self.number = number
+        self.load = load
+        self.max_voltage, self.max_current = _LIMITS[number]
+        self.voltage = 0.0
+        self.current = self.max_current
+        self.on = False
+        self.ocp = False
+        self.ocp_value = self.max_current + 0.2
+        self.ovp = False
+        self.ovp_value = self.max_voltage + 1.0
+
+    def measure(self):
+        """ Return the output voltage, current and power. """
+        if not self.on:
+            return 0.0, 0.0, 0.0
+        current = min(self.voltage / self.load, self.current)
+        voltage = current * self.load
+        return voltage, current, voltage * current
+
+    def mode(self) -> str:
+        if not self.on:
+            return "CV"
+        return "CC" if self.voltage / self.load > self.current else "CV"
+
+    def protect(self):
+        voltage, current, _ = self.measure()
+        if (self.ocp and current >= self.ocp_value) or (self.ovp and voltage >= self.ovp_value):
+            self.on = False
+
+
+class SimulatedDP832(Model):
+    """ SCPI model of a Rigol DP832 programmable power supply.
+
+    Every channel drives a resistive load, so measurements, CV/CC mode and OCP/OVP trips follow the settings.
+    The timer of the selected channel steps through its groups in real time.
+
+    Parameters
+    ----------
+    loads : tuple of float
+        Resistance in ohms of the load connected to each channel
+    """
+
+    IDN = "RIGOL TECHNOLOGIES,DP832,DP8C000000000,00.01.16"
+
+    def __init__(self, loads=(10.0, 10.0, 10.0)):
+        super().__init__()
+        self.loads = loads
+        self.command("INSTrument:NSELect", lambda channel: self._select(int(channel)))
+        self.command("INSTrument:NSELect?", lambda: str(self.selected))
+        self.command("INSTrument:SELEct", lambda channel: self._select(int(channel.upper().lstrip("CH"))))
+        self.command("INSTrument:SELEct?", lambda: f"CH{self.selected}")
+        self.command("SOURce#:VOLTage", lambda n, value: self._set(n, "voltage", float(value)))
+        self.command("SOURce#:VOLTage?", lambda n: f"{self.channels[n].voltage:.3f}")
+        self.command("SOURce#:CURRent", lambda n, value: self._set(n, "current", float(value)))
+        self.command("SOURce#:CURRent?", lambda n: f"{self.channels[n].current:.3f}")
+        self.command("OUTPut:STATe", lambda channel, state: self._set(_channel(channel), "on", _on(state)))
+        self.command("OUTPut:STATe?", lambda channel: _state(self.channels[_channel(channel)].on))
+        self.command("OUTPut:MODE?", lambda channel: self.channels[_channel(channel)].mode())
+        self.command("OUTPut:OCP", lambda channel, state: self._set(_channel(channel), "ocp", _on(state)))
+        self.command("OUTPut:OCP?", lambda channel: _state(self.channels[_channel(channel)].ocp))
+        self.command("OUTPut:OCP:VALue", lambda channel, value: self._set(_channel(channel), "ocp_value",
+                                                                          float(value)))
+        self.command("OUTPut:OCP:VALue?", lambda channel: f"{self.channels[_channel(channel)].ocp_value:.3f}")
+        self.command("OUTPut:OVP", lambda channel, state: self._set(_channel(channel), "ovp", _on(state)))
+        self.command("OUTPut:OVP?", lambda channel: _state(self.channels[_channel(channel)].ovp))
+        self.command("OUTPut:OVP:VALue", lambda channel, value: self._set(_channel(channel), "ovp_value",
+                                                                          float(value)))
+        self.command("OUTPut:OVP:VALue?", lambda channel: f"{self.channels[_channel(channel)].ovp_value:.3f}")
+        self.command("MEASure:VOLTage?", lambda channel="CH1": f"{self._measure(channel)[0]:.3f}")
+        self.command("MEASure:CURRent?", lambda channel="CH1": f"{self._measure(channel)[1]:.3f}")
+        self.command("MEASure:POWEr?", lambda channel="CH1": f"{self._measure(channel)[2]:.3f}")
+        self.command("MEASure:ALL?", lambda channel="CH1": ",".join(f"{v:.3f}" for v in self._measure(channel)))
+        self.command("TIMEr:CYCLEs", self._cycles)
+        self.command("TIMEr:CYCLEs?", lambda: str(self.timer_cycles))
+        self.command("TIMEr:GROUPs", lambda number: self._timer_setting("timer_groups", int(number)))
+        self.command("TIMEr:GROUPs?", lambda: str(self.timer_groups))
+        self.command("TIMEr:PARAmeter", self._parameter)
+        self.command("TIMEr:PARAmeter?", self._parameter_query)
+        self.command("TIMEr:ENDState", lambda state: self._timer_setting("timer_end_state", state.upper()[:4]))
+        self.command("TIMEr:ENDState?", lambda: self.timer_end_state)
+        self.command("TIMEr:STATe", self._timer_state)
+        self.command("TIMEr:STATe?", lambda: _state(self.timer_start is not None))
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.channels = {n: Channel(n, load) for n, load in zip((1, 2, 3), self.loads)}
+        self.selected = 1
+        self.timer_cycles = 1
+        self.timer_groups = 1
+        self.timer_end_state = "OFF"
+        self.timer_parameters = {}
+        self.timer_channel = None
+        self.timer_start = None
+
+    def advance(self):
+        if self.timer_start is not None:
+            channel = self.channels[self.timer_channel]
+            elapsed = time.monotonic() - self.timer_start
+            steps = [self.timer_parameters.get(group, (0.0, 0.0, 1.0)) for group in range(self.timer_groups)]
+            period = sum(seconds for _, _, seconds in steps)
+            if period <= 0 or elapsed >= period * self.timer_cycles:
+                channel.voltage, channel.current = steps[-1][0], steps[-1][1]
+                self.timer_start = None
+                if self.timer_end_state == "OFF":
+                    channel.on = False
+            else:
+                elapsed %= period
+                for voltage, current, seconds in steps:
+                    channel.voltage, channel.current = voltage, current
+                    if elapsed < seconds:
+                        break
+                    elapsed -= seconds
+        for channel in self.channels.values():
+            channel.protect()
+
+    def _select(self, channel: int):
+        if channel not in self.channels:
+            raise ValueError("Data out of range")
+        self.selected = channel
+
+    def _set(self, channel: int, setting: str, value):
+        limits = {"voltage": self.channels[channel].max_voltage, "current": self.channels[channel].max_current}
+        if setting in limits and not 0.0 <= value <= limits[setting] * 1.07:
+            raise ValueError("Data out of range")
+        setattr(self.channels[channel], setting, value)
+
+    def _measure(self, channel: str):
+        return self.channels[_channel(channel)].measure()
+
+    def _timer_setting(self, setting: str, value):
+        if self.timer_start is not None:
+            raise ValueError("Settings conflict; timer is running")
+        setattr(self, setting, value)
+
+    def _cycles(self, mode: str, number: str = "1"):
+        self._timer_setting("timer_cycles", 2 ** 31 if mode.upper().startswith("I") else int(number))
+
+    def _parameter(self, group: str, voltage: str, current: str, seconds: str):
+        if self.timer_start is not None:
+            raise ValueError("Settings conflict; timer is running")
+        self.timer_parameters[int(group)] = (float(voltage), float(current), float(seconds))
+
+    def _parameter_query(self, first: str = "0", count: str = "1") -> str:
+        values = []
+        for group in range(int(first), int(first) + int(count)):
+            voltage, current, seconds = self.timer_parameters.get(group, (0.0, 0.0, 1.0))
+            values.append(f"{group},{voltage:.3f},{current:.3f},{seconds:g}")
+        return ",".join(values)
+
+    def _timer_state(self, state: str):
+        if _on(state):
+            self.timer_channel = self.selected
+            self.timer_start = time.monotonic()
+        else:
+            self.timer_start = None
+
+
+def _channel(channel: str) -> int:
+    return int(channel.upper().lstrip("CH"))
+
+
+def _on(state: str) -> bool:
+    return state.upper() in ("ON", "1")
+
+
+def _state(on: bool) -> str:
+    return "ON" if on else "OFF"
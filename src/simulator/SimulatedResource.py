@@ -0,0 +1,108 @@
+import math
+import struct
+import time
+from collections import deque
+
+import numpy
+
+from utils import Block
+
+
+class SimulatedResource:
+    """ In-process stand-in for a pyvisa MessageBasedResource connected to a simulated instrument.
+
+    Every message written costs latency seconds plus its size divided by bandwidth, and every response read
+    costs its size divided by bandwidth, so transfers take about as long as on a real link. Responses are read
+    in chunks of chunk_size bytes and every chunk after the first costs latency seconds too, like the read
+    requests of VXI-11. Reading when the instrument has no response ready, or a chunk that takes longer than
+    the timeout, raises a VisaIOError timeout.
+
+    Parameters
+    ----------
+    resource_name : str
+        Name of the resource
+    model : Model
+        Simulated instrument that executes the commands
+    latency : float
+        Seconds added to every message written
+    bandwidth : float
+        Bytes per second of the link; unlimited by default
+    """
+
+    def __init__(self, resource_name: str, model, latency: float = 0.0, bandwidth: float = None):
+        self.resource_name = resource_name
+        self.model = model
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.timeout = 2000
+        self.encoding = 'ascii'
+        self.read_termination = None
+        self.write_termination = '\r\n'
+        self.chunk_size = 20 * 1024
+        self.query_delay = 0.0
+        self._responses = deque()
+
+    def _transfer(self, size: int, latency: float):
+        seconds = latency + (size / self.bandwidth if self.bandwidth else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def write_raw(self, message: bytes) -> int:
+        self._transfer(len(message), self.latency)
+        response = self.model.execute(message.decode('latin_1'))
+        if response is not None:
+            self._responses.append(response + b'\n')
+        return len(message)
+
+    def write(self, message: str, termination: str = None, encoding: str = None) -> int:
+        termination = self.write_termination if termination is None else termination
+        return self.write_raw((message + (termination or '')).encode(encoding or self.encoding))
+
+    def read_raw(self, size: int = None) -> bytes:
+        if not self._responses:
+            raise visa_error('error_timeout')
+        response = self._responses.popleft()
+        chunk = min(len(response), size or self.chunk_size)
+        if self.latency + (chunk / self.bandwidth if self.bandwidth else 0.0) > self.timeout / 1000:
+            time.sleep(self.timeout / 1000)
+            raise visa_error('error_timeout')
+        self._transfer(len(response), self.latency * (math.ceil(len(response) / chunk) - 1))
+        return response
+
+    def read(self, termination: str = None, encoding: str = None) -> str:
+        message = self.read_raw().decode(encoding or self.encoding)
+        termination = self.read_termination if termination is None else termination
+        if termination and message.endswith(termination):
+            message = message[:-len(termination)]
+        return message
+
+    def query(self, message: str, delay: float = None) -> str:
+        self.write(message)
+        return self.read()
+
+    def query_ascii_values(self, message: str, converter='f', separator=',', container=list, delay: float = None):
+        values = self.query(message, delay).strip().split(separator)
+        convert = {'f': float, 'd': int, 's': str}.get(converter, converter)
+        return container([convert(value) for value in values])
+
+    def query_binary_values(self, message: str, datatype='f', is_big_endian=False, container=list,
+                            delay: float = None, header_fmt='ieee', expect_termination=True, **kwargs):
+        self.write(message)
+        payload = Block.decode(self.read_raw())
+        dtype = ('>' if is_big_endian else '<') + datatype
+        if container is numpy.array or (isinstance(container, type) and issubclass(container, numpy.ndarray)):
+            return numpy.frombuffer(payload, dtype)
+        return container(struct.unpack(f"{dtype[0]}{len(payload) // struct.calcsize(datatype)}{datatype}", payload))
+
+    def clear(self):
+        self._responses.clear()
+
+    def close(self):
+        self._responses.clear()
+
+
+def visa_error(status: str):
+    """ Return the VisaIOError of a pyvisa StatusCode name. pyvisa is imported only when an error is raised. """
+    from pyvisa import constants
+    from pyvisa.errors import VisaIOError
+    return VisaIOError(getattr(constants.StatusCode, status))
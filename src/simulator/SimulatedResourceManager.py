@@ -0,0 +1,45 @@
+
+from simulator.SimulatedResource import SimulatedResource
+from simulator.SimulatedResource import visa_error
+
+
+class SimulatedResourceManager:
+    """ Stand-in for pyvisa.ResourceManager that opens sessions to simulated instruments.
+
+    Pass it to DMM6500 or DP832 in place of a ResourceManager. Sessions opened to the same resource name share
+    the simulated instrument, like sessions to a real one.
+
+    Parameters
+    ----------
+    instruments : dict
+        Simulated instrument (SimulatedDMM6500 or SimulatedDP832) of each resource name
+    latency : float
+        Seconds added to every message written
+    bandwidth : float
+        Bytes per second of the link; unlimited by default
+
+    Examples
+    --------
+    >>> rm = SimulatedResourceManager({'TCPIP::192.168.252.20::INSTR': SimulatedDMM6500()}, latency=0.001)
+    >>> dmm = DMM6500(rm)
+    >>> dmm.open('TCPIP::192.168.252.20::INSTR')
+    """
+
+    def __init__(self, instruments: dict = None, latency: float = 0.0, bandwidth: float = None):
+        self.instruments = dict(instruments or {})
+        self.latency = latency
+        self.bandwidth = bandwidth
+
+    def list_resources(self, query: str = '?*::INSTR'):
+        return tuple(self.instruments)
+
+    def open_resource(self, resource_name: str, **kwargs) -> SimulatedResource:
+        if resource_name not in self.instruments:
+            raise visa_error('error_resource_not_found')
+        resource = SimulatedResource(resource_name, self.instruments[resource_name], self.latency, self.bandwidth)
+        for name, value in kwargs.items():
+            setattr(resource, name, value)
+        return resource
+
+    def close(self):
+        pass
@@ -0,0 +1,87 @@
+import socket
+import threading
+
+
+class SimulatedServer:
+    """ Raw SCPI socket server of a simulated instrument, a local stand-in for port 5025 of the instruments.
+
+    Every connection is served by its own thread. Messages end with a line feed, and the response of every
+    message with queries is sent back followed by a line feed. Binary blocks are sent as they are.
+
+    Parameters
+    ----------
+    model : Model
+        Simulated instrument that executes the commands
+    host : str
+        Address to listen on
+    port : int
+        Port to listen on; any free port by default
+
+    Examples
+    --------
+    >>> with SimulatedServer(SimulatedDMM6500()) as server:
+    ...     dmm = DMM6500(SocketResourceManager())
+    ...     dmm.open(server.resource_name)
+    """
+
+    def __init__(self, model, host: str = '127.0.0.1', port: int = 0):
+        self.model = model
+        self.host = host
+        self.port = port
+        self._listener = None
+        self._thread = None
+
+    def __enter__(self) -> 'SimulatedServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    @property
+    def resource_name(self) -> str:
+        """ VISA resource name of the socket """
+        return f"TCPIP::{self.host}::{self.port}::SOCKET"
+
+    def start(self):
+        """ Listen on the port and accept connections in a background thread. """
+        self._listener = socket.create_server((self.host, self.port))
+        self.port = self._listener.getsockname()[1]
+        self._thread = threading.Thread(target=self._accept, name="SCPI server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stop accepting connections. """
+        if self._listener is not None:
+            try:
+                self._listener.shutdown(socket.SHUT_RDWR)  # Wakes up the accepting thread
+            except OSError:
+                pass
+            self._listener.close()
+            self._thread.join()
+            self._listener = None
+
+    def _accept(self):
+        while True:
+            try:
+                connection, _ = self._listener.accept()
+            except OSError:
+                return
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._serve, args=(connection,), name="SCPI connection", daemon=True).start()
+
+    def _serve(self, connection: socket.socket):
+        pending = b""
+        with connection:
+            while True:
+                try:
+                    data = connection.recv(65536)
+                except OSError:
+                    return
+                if not data:
+                    return
+                *messages, pending = (pending + data).split(b"\n")
+                for message in messages:
+                    response = self.model.execute(message.decode('latin_1'))
+                    if response is not None:
+                        connection.sendall(response + b"\n")
@@ -0,0 +1,47 @@
+import asyncio
+import functools
+import inspect
+from concurrent.futures import Executor
+
+
+class AsyncProxy:
+    """ Awaitable view of an instrument or one of its subsystems.
+
+    Every method of the wrapped object becomes a coroutine function that runs the blocking call in the executor,
+    and generator methods become async generators. All the subsystems of an instrument share one single-thread
+    executor, so the calls to one session run in order while other instruments run concurrently.
+    """
+
+    def __init__(self, target, executor: Executor):
+        self._target = target
+        self._executor = executor
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if inspect.isgeneratorfunction(attribute):
+            return self._async_generator(attribute)
+        elif callable(attribute):
+            return self._coroutine(attribute)
+        return attribute
+
+    async def _run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    def _coroutine(self, function):
+        @functools.wraps(function)
+        async def coroutine(*args, **kwargs):
+            return await self._run(function, *args, **kwargs)
+        return coroutine
+
+    def _async_generator(self, function):
+        @functools.wraps(function)
+        async def generator(*args, **kwargs):
+            iterator = await self._run(function, *args, **kwargs)
+            done = object()
+            while True:
+                item = await self._run(next, iterator, done)
+                if item is done:
+                    return
+                yield item
+        return generator
@@ -0,0 +1,46 @@
+def encode(payload: bytes) -> bytes:
+    """ Return an IEEE-488.2 definite-length block with the payload.
+
+    Parameters
+    ----------
+    payload : bytes
+        Data of the block
+    """
+    length = str(len(payload))
+    return b"#" + str(len(length)).encode() + length.encode() + payload
+
+
+def header(data: bytes):
+    """ Return the offset and the length of the payload of an IEEE-488.2 definite-length block.
+
+    Bytes before the '#' that starts the block are skipped. The length is None when the header is not complete
+    yet, so the caller can read more bytes and try again.
+
+    Parameters
+    ----------
+    data : bytes
+        Start of the response that contains the block
+    """
+    begin = data.find(b"#")
+    if begin < 0 or len(data) < begin + 2:
+        return None, None
+    digits = int(data[begin + 1:begin + 2])
+    if digits == 0:
+        raise ValueError("Indefinite-length blocks are not supported")
+    if len(data) < begin + 2 + digits:
+        return None, None
+    return begin + 2 + digits, int(data[begin + 2:begin + 2 + digits])
+
+
+def decode(data: bytes) -> bytes:
+    """ Return the payload of a complete IEEE-488.2 definite-length block.
+
+    Parameters
+    ----------
+    data : bytes
+        Response that contains the block
+    """
+    offset, length = header(data)
+    if length is None or len(data) < offset + length:
+        raise ValueError("Incomplete block")
+    return data[offset:offset + length]
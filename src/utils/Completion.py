@@ -0,0 +1,77 @@
+import time
+
+
+def wait_service_request(session, timeout: float = None):
+    """ Wait for the pending overlapped operations of an instrument to complete using a service request.
+
+    The instrument is set to request service when *OPC sets the operation complete bit of the standard event
+    status register. Returns True when the request arrives, False on timeout, and None when the transport does
+    not support service request events, so the caller can fall back to polling.
+
+    Parameters
+    ----------
+    session : Session
+        Session of the instrument
+    timeout : float
+        Seconds to wait; forever by default
+    """
+    resource = session.resource
+    if not hasattr(resource, 'enable_event'):
+        return None  # Sockets without VISA and simulated resources, which work without pyvisa installed
+    # Imported here so analysis code that never waits on an instrument does not load pyvisa
+    from pyvisa import constants
+    from pyvisa.errors import VisaIOError
+
+    try:
+        resource.enable_event(constants.EventType.service_request, constants.EventMechanism.queue)
+    except (AttributeError, NotImplementedError, VisaIOError):
+        return None
+    try:
+        session.query('*ESR?')  # Clear the operation complete bit of previous operations
+        session.write('*ESE 1;*SRE 32;*OPC')
+        milliseconds = constants.VI_TMO_INFINITE if timeout is None else max(int(timeout * 1000), 1)
+        try:
+            resource.wait_on_event(constants.EventType.service_request, milliseconds)
+        except VisaIOError as err:
+            if err.error_code == constants.StatusCode.error_timeout:
+                return False
+            raise
+        resource.read_stb()
+        return True
+    finally:
+        resource.disable_event(constants.EventType.service_request, constants.EventMechanism.queue)
+        session.write('*SRE 0')
+
+
+def poll(done, timeout: float = None, interval: float = 0.001, max_interval: float = 0.05) -> bool:
+    """ Call done until it returns True, waiting longer after every call that returns False.
+
+    The first polls come quickly so short operations are noticed right away, and the interval grows by half
+    after every poll up to max_interval so long operations do not flood the instrument with queries.
+
+    Parameters
+    ----------
+    done : callable
+        Function without arguments that returns True when the operation is complete
+    timeout : float
+        Seconds to wait; forever by default
+    interval : float
+        Seconds to wait after the first poll
+    max_interval : float
+        Longest wait between two polls in seconds
+    Returns
+    -------
+    bool
+        True if the operation completed, False on timeout.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while not done():
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+        else:
+            time.sleep(interval)
+        interval = min(interval * 1.5, max_interval)
+    return True
@@ -0,0 +1,104 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+
+class UnitResult(NamedTuple):
+    unit: object  # Instrument the call ran on
+    value: object  # Returned value; None if the call raised
+    error: BaseException  # Raised exception; None if the call succeeded
+
+
+class GroupResult(tuple):
+    """ UnitResult of every member of a group, in the order of the members. """
+
+    @property
+    def values(self) -> list:
+        """ Returned value of every member; None for members whose call raised """
+        return [result.value for result in self]
+
+    @property
+    def errors(self) -> list:
+        """ UnitResult of the members whose call raised """
+        return [result for result in self if result.error is not None]
+
+    @property
+    def ok(self) -> bool:
+        """ True if the call succeeded on every member """
+        return not self.errors
+
+    def raise_errors(self):
+        """ Raise the exception of the first member whose call raised, if any. """
+        for result in self:
+            if result.error is not None:
+                raise result.error
+
+
+class Group:
+    """ Runs the same call on several DMM6500 or DP832 instruments at the same time.
+
+    Attributes and methods are reached through the group as on a single instrument; calling a method runs it on
+    every member in a thread pool of at most max_workers threads and returns a GroupResult. An exception on one
+    member does not stop the others.
+
+    Parameters
+    ----------
+    members : list
+        Instruments of the group
+    max_workers : int
+        Maximum number of members called at the same time
+
+    Examples
+    --------
+    >>> supplies = Group([DP832(rm) for _ in names])
+    >>> supplies.map(DP832.open, names).raise_errors()
+    >>> supplies.source.voltage(1, 3.3)
+    """
+
+    def __init__(self, members, max_workers: int = 8):
+        self.members = list(members)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def __getattr__(self, name):
+        return _Path(self, (name,))
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    def map(self, function, *iterables) -> GroupResult:
+        """ Call a function with every member and its own arguments, at the same time.
+
+        Parameters
+        ----------
+        function : callable
+            Function called with the member followed by one item of every iterable
+        iterables
+            Arguments of every member, in the order of the members
+        """
+        arguments = zip(*iterables) if iterables else ((),) * len(self.members)
+        futures = [(member, self._executor.submit(function, member, *args))
+                   for member, args in zip(self.members, arguments)]
+        results = []
+        for member, future in futures:
+            try:
+                results.append(UnitResult(member, future.result(), None))
+            except Exception as err:
+                results.append(UnitResult(member, None, err))
+        return GroupResult(results)
+
+    def close(self):
+        """ Stop the threads of the group. The instruments are not closed. """
+        self._executor.shutdown()
+
+
+class _Path:
+    def __init__(self, group: Group, names: tuple):
+        self._group = group
+        self._names = names
+
+    def __getattr__(self, name):
+        return _Path(self._group, self._names + (name,))
+
+    def __call__(self, *args, **kwargs) -> GroupResult:
+        names = self._names
+        return self._group.map(lambda member: functools.reduce(getattr, names, member)(*args, **kwargs))
@@ -0,0 +1,91 @@
+import math
+import threading
+from typing import NamedTuple
+
+_BUCKETS_PER_DECADE = 50
+_MIN_EXPONENT = -7  # 100 ns
+
+
+class CommandSummary(NamedTuple):
+    count: int
+    bytes_sent: int
+    bytes_received: int
+    total_seconds: float
+    p50: float
+    p95: float
+    p99: float
+
+
+class Metrics:
+    """ Listener of a session that records call count, bytes and a latency histogram per SCPI command header.
+
+    Latencies are counted in logarithmic buckets, 50 per decade, so percentiles are accurate within 5% and
+    memory does not grow with the number of calls.
+
+    Examples
+    --------
+    >>> metrics = Metrics()
+    >>> dmm.add_listener(metrics)
+    >>> dmm.trace.stats("defbuffer1")
+    >>> metrics.summary()[':TRAC:STAT:AVER?;:TRAC:STAT:MAX?;...']
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands = {}
+
+    def __call__(self, header: str, sent: int, received: int, seconds: float):
+        """ Record one message sent to the instrument.
+
+        Parameters
+        ----------
+        header : str
+            Headers of the commands in the message, joined with ';'
+        sent : int
+            Bytes sent
+        received : int
+            Bytes received; 0 for commands that have no response
+        seconds : float
+            Time the write, or the write and the read of the response, took
+        """
+        bucket = max(int((math.log10(seconds) - _MIN_EXPONENT) * _BUCKETS_PER_DECADE), 0) if seconds > 0 else 0
+        with self._lock:
+            command = self._commands.get(header)
+            if command is None:
+                command = self._commands[header] = [0, 0, 0, 0.0, {}]
+            command[0] += 1
+            command[1] += sent
+            command[2] += received
+            command[3] += seconds
+            command[4][bucket] = command[4].get(bucket, 0) + 1
+
+    def summary(self) -> dict:
+        """ Return the CommandSummary of every header recorded, with latency percentiles in seconds. """
+        with self._lock:
+            return {header: CommandSummary(count, sent, received, seconds, _percentile(histogram, count, 0.50),
+                                           _percentile(histogram, count, 0.95), _percentile(histogram, count, 0.99))
+                    for header, (count, sent, received, seconds, histogram) in self._commands.items()}
+
+    def reset(self):
+        """ Forget everything recorded so far. """
+        with self._lock:
+            self._commands.clear()
+
+    def report(self) -> str:
+        """ Return a table of the summary, slowest headers first. """
+        lines = [f"{'count':>8} {'sent':>10} {'received':>12} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+                 f"{'p99 ms':>9}  header"]
+        for header, s in sorted(self.summary().items(), key=lambda item: -item[1].total_seconds):
+            lines.append(f"{s.count:>8} {s.bytes_sent:>10} {s.bytes_received:>12} {s.total_seconds:>9.3f} "
+                         f"{s.p50 * 1e3:>9.3f} {s.p95 * 1e3:>9.3f} {s.p99 * 1e3:>9.3f}  {header}")
+        return "\n".join(lines)
+
+
+def _percentile(histogram: dict, count: int, fraction: float) -> float:
+    rank = fraction * count
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= rank:
+            return 10 ** (_MIN_EXPONENT + (bucket + 0.5) / _BUCKETS_PER_DECADE)
+    return 0.0
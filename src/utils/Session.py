@@ -0,0 +1,276 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+
+from utils.StateCache import StateCache
+
+if TYPE_CHECKING:
+    from pyvisa.resources import MessageBasedResource
+
+
+class Session:
+    """ Session of an instrument shared by all its subsystems.
+
+    Commands are sent to the underlying VISA resource right away, unless a batch is open. Inside a batch
+    written commands are queued and later sent joined with ';' in as few messages as the input buffer of the
+    instrument allows. When a state cache is given, settings written or read through write_setting and
+    query_setting are remembered so unchanged settings are not sent again. Every message sent is reported to the
+    listeners, if there are any, with the headers of its commands, the bytes sent and received and the time it
+    took. Attributes not defined here are read from the VISA resource.
+
+    A session can be shared by several threads. Every message and its response hold a lock, so messages of
+    different threads are never interleaved, and every thread has its own batch, unless a shared batch is open.
+    """
+
+    def __init__(self, resource: 'MessageBasedResource', max_length: int = 256, cache: StateCache = None,
+                 listeners: list = None):
+        self._resource = resource
+        self._max_length = max_length
+        self._local = threading.local()
+        self._shared = None
+        self._lock = threading.RLock()
+        self.cache = cache
+        self.listeners = listeners if listeners is not None else []
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+    @property
+    def _queue(self) -> list:
+        queue = getattr(self._local, 'queue', None)
+        return self._shared if queue is None else queue
+
+    @property
+    def resource(self) -> 'MessageBasedResource':
+        return self._resource
+
+    def write(self, command: str):
+        """ Send a command, or queue it while a batch is open.
+
+        Parameters
+        ----------
+        command : str
+            SCPI command to send
+        """
+        if getattr(self._local, 'queue', None) is not None:
+            self._local.queue.append(command)
+            return
+        with self._lock:
+            if self._shared is not None:
+                self._shared.append(command)
+                return
+            self._write(command)
+
+    def write_setting(self, key: str, value, command: str):
+        """ Send a command that changes a setting, unless the cache knows the setting already has the value.
+
+        Parameters
+        ----------
+        key : str
+            Header of the setting
+        value
+            New value of the setting
+        command : str
+            SCPI command that sets the value
+        """
+        if self.cache is None:
+            self.write(command)
+            return
+        found, cached = self.cache.lookup(key)
+        if found and cached == value:
+            self.cache.hits += 1
+            return
+        self.cache.misses += 1
+        self.write(command)
+        self.cache.store(key, value)
+
+    def query_setting(self, key: str, command: str, parse):
+        """ Return the value of a setting from the cache, or send a query and remember its parsed response.
+
+        Parameters
+        ----------
+        key : str
+            Header of the setting
+        command : str
+            SCPI query that retrieves the value
+        parse : callable
+            Function that converts the response to the value
+        """
+        if self.cache is None:
+            return parse(self.query(command))
+        found, value = self.cache.lookup(key)
+        if found:
+            self.cache.hits += 1
+            return value
+        self.cache.misses += 1
+        value = parse(self.query(command))
+        self.cache.store(key, value)
+        return value
+
+    def query(self, command: str) -> str:
+        """ Send queued commands followed by a query and return the response.
+
+        Parameters
+        ----------
+        command : str
+            SCPI query to send
+        """
+        with self._lock:
+            self.flush()
+            if not self.listeners:
+                return self._resource.query(command)
+            start = time.perf_counter()
+            response = self._resource.query(command)
+            self._notify(command, len(response) + 1, time.perf_counter() - start)
+            return response
+
+    def query_binary_values(self, command: str, **kwargs):
+        """ Send queued commands followed by a query and return the binary block of the response.
+
+        Parameters
+        ----------
+        command : str
+            SCPI query to send
+        kwargs
+            Arguments of MessageBasedResource.query_binary_values
+        """
+        with self._lock:
+            self.flush()
+            if not self.listeners:
+                return self._resource.query_binary_values(command, **kwargs)
+            start = time.perf_counter()
+            values = self._resource.query_binary_values(command, **kwargs)
+            self._notify(command, getattr(values, 'nbytes', len(values)), time.perf_counter() - start)
+            return values
+
+    def query_many(self, commands) -> list:
+        """ Send several queries joined with ';' in as few messages as possible and return their responses.
+
+        Responses are split at ';', so every query must return a single value.
+
+        Parameters
+        ----------
+        commands : list of str
+            SCPI queries to send
+        """
+        responses = []
+        with self._lock:
+            for message in self._join(commands):
+                responses += self.query(message).split(';')
+        return responses
+
+    def flush(self):
+        """ Send all queued commands, joined in as few messages as the maximum message length allows. """
+        with self._lock:
+            if getattr(self._local, 'queue', None) is not None:
+                queue, self._local.queue = self._local.queue, []
+            elif self._shared is not None:
+                queue, self._shared = self._shared, []
+            else:
+                return
+            for message in self._join(queue):
+                self._write(message)
+
+    def _join(self, commands):
+        message = ""
+        for command in commands:
+            if message and len(message) + 1 + len(command) > self._max_length:
+                yield message
+                message = command
+            else:
+                message = f"{message};{command}" if message else command
+        if message:
+            yield message
+
+    def _write(self, message: str):
+        if not self.listeners:
+            self._resource.write(message)
+            return
+        start = time.perf_counter()
+        self._resource.write(message)
+        self._notify(message, 0, time.perf_counter() - start)
+
+    def _notify(self, message: str, received: int, seconds: float):
+        headers = [command.strip().split(" ", 1)[0].upper() for command in message.split(";")]
+        header = ";".join(dict.fromkeys(headers))
+        for listener in self.listeners:
+            listener(header, len(message) + 1, received, seconds)
+
+    @contextmanager
+    def transfer(self, timeout: int = None, chunk_size: int = None):
+        """ Hold the session and change the timeout and read chunk size of the resource until the block exits.
+
+        Queued commands are sent first. Other threads wait until the block exits, so the settings only apply to
+        the messages of the block, and they are restored afterwards.
+
+        Parameters
+        ----------
+        timeout : int
+            VISA timeout in milliseconds; unchanged by default
+        chunk_size : int
+            Bytes requested by every read of the resource; unchanged by default
+        """
+        with self._lock:
+            self.flush()
+            saved = self._resource.timeout, self._resource.chunk_size
+            try:
+                if timeout is not None:
+                    self._resource.timeout = timeout
+                if chunk_size is not None:
+                    self._resource.chunk_size = chunk_size
+                yield self
+            finally:
+                self._resource.timeout, self._resource.chunk_size = saved
+
+    def close(self):
+        """ Close the VISA session. Queued commands are discarded. """
+        with self._lock:
+            self._local.queue = None
+            self._shared = None
+            self._resource.close()
+
+    @contextmanager
+    def batch(self, opc: bool = False, shared: bool = False):
+        """ Queue written commands until the block exits and then send them in as few messages as possible.
+
+        Queries sent inside the block first send the commands queued so far, so the order of commands is kept.
+        Queued commands are discarded, and the state cache cleared, if the block raises an exception. Nested
+        batches join the outer one. Only the commands of the thread that opened the batch are queued, unless the
+        batch is shared: a shared batch queues the commands of every thread, so it can be opened, used and
+        closed from different threads, like the workers of the executor of an async instrument.
+
+        Parameters
+        ----------
+        opc : bool
+            True to wait for the instrument to complete all the commands with *OPC? after sending them
+        shared : bool
+            True to queue the commands of all threads
+        """
+        if self._queue is not None:
+            yield self
+            return
+        with self._lock:
+            if shared:
+                self._shared = []
+            else:
+                self._local.queue = []
+        try:
+            yield self
+            with self._lock:
+                self.flush()
+                self._close_batch(shared)
+        except BaseException:
+            with self._lock:
+                self._close_batch(shared)
+            if self.cache is not None:
+                self.cache.invalidate()
+            raise
+        if opc:
+            self.query('*OPC?')
+
+    def _close_batch(self, shared: bool):
+        if shared:
+            self._shared = None
+        else:
+            self._local.queue = None
@@ -0,0 +1,139 @@
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pyvisa import ResourceManager
+    from pyvisa.resources import MessageBasedResource
+
+
+class PooledResource:
+    """ VISA resource lent by a SessionPool. Closing it returns the session to the pool instead of closing it. """
+
+    def __init__(self, pool, resource: 'MessageBasedResource', name: str):
+        object.__setattr__(self, '_pool', pool)
+        object.__setattr__(self, '_resource', resource)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, name):
+        return getattr(self._resource, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resource, name, value)
+
+    def close(self):
+        """ Return the session to the pool. """
+        if self._resource is not None:
+            self._pool.release(self._resource, self._name)
+            object.__setattr__(self, '_resource', None)
+
+
+class SessionPool:
+    """ Open VISA sessions kept for reuse, by resource name.
+
+    Pass it to DMM6500 or DP832 in place of the ResourceManager. open_resource hands out an idle session of the
+    resource if there is one that answers the health check query, and opens a new one otherwise. Closing the
+    instrument returns its session to the pool, so the next open skips the connection and handshake. Sessions
+    idle for longer than max_idle seconds are closed.
+
+    Parameters
+    ----------
+    resource_manager : ResourceManager
+        Resource manager used to open new sessions
+    max_idle : float
+        Seconds a session can stay idle in the pool
+    health_check : str
+        Query sent to an idle session before lending it; sessions that fail it are closed
+    expected : str
+        Response expected to the health check query
+
+    Examples
+    --------
+    >>> pool = SessionPool(visa.ResourceManager())
+    >>> dmm = DMM6500(pool)
+    >>> dmm.open('TCPIP::192.168.252.20::INSTR')
+    >>> dmm.close()  # The session stays open in the pool
+    """
+
+    def __init__(self, resource_manager: 'ResourceManager', max_idle: float = 300.0, health_check: str = '*OPC?',
+                 expected: str = '1'):
+        self._resource_manager = resource_manager
+        self.max_idle = max_idle
+        self.health_check = health_check
+        self.expected = expected
+        self._lock = threading.Lock()
+        self._idle = {}
+
+    def open_resource(self, resource_name: str, **kwargs) -> PooledResource:
+        """ Return an open session to the resource, reusing an idle one when possible.
+
+        Parameters
+        ----------
+        resource_name : str
+            Name or alias of the resource to open.
+        kwargs
+            Attributes to set on the session
+        """
+        self.evict()
+        while True:
+            with self._lock:
+                idle = self._idle.get(resource_name)
+                resource = idle.pop()[0] if idle else None
+            if resource is None:
+                resource = self._resource_manager.open_resource(resource_name)
+                break
+            if self._healthy(resource):
+                break
+            self._close(resource)
+        for name, value in kwargs.items():
+            setattr(resource, name, value)
+        return PooledResource(self, resource, resource_name)
+
+    def release(self, resource: 'MessageBasedResource', resource_name: str = None):
+        """ Put a session back in the pool.
+
+        Sessions are kept under the name they were opened with, since VISA reports the canonical form of the
+        name in resource_name, e.g. 'TCPIP0::192.168.252.20::inst0::INSTR' for 'TCPIP::192.168.252.20::INSTR'.
+
+        Parameters
+        ----------
+        resource : MessageBasedResource
+            Session to keep for reuse
+        resource_name : str
+            Name passed to open_resource; the resource_name of the session by default
+        """
+        name = resource.resource_name if resource_name is None else resource_name
+        with self._lock:
+            self._idle.setdefault(name, []).append((resource, time.monotonic()))
+
+    def evict(self):
+        """ Close the sessions that have been idle for longer than max_idle seconds. """
+        expired = []
+        limit = time.monotonic() - self.max_idle
+        with self._lock:
+            for name, idle in self._idle.items():
+                expired += [resource for resource, since in idle if since < limit]
+                idle[:] = [(resource, since) for resource, since in idle if since >= limit]
+        for resource in expired:
+            self._close(resource)
+
+    def close(self):
+        """ Close all the idle sessions. """
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for sessions in idle.values():
+            for resource, _ in sessions:
+                self._close(resource)
+
+    def _healthy(self, resource: 'MessageBasedResource') -> bool:
+        try:
+            return resource.query(self.health_check).strip() == self.expected
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close(resource: 'MessageBasedResource'):
+        try:
+            resource.close()
+        except Exception:
+            pass
@@ -0,0 +1,148 @@
+import socket
+import struct
+
+import numpy
+
+from utils import Block
+
+
+class SocketResource:
+    """ Raw SCPI client over a TCP socket, used in place of a pyvisa MessageBasedResource.
+
+    The DMM6500 and the DP832 accept SCPI on TCP port 5025 without the RPC framing of VXI-11, so every message
+    is a single send and every response is read straight from the socket until the read termination. Nagle's
+    algorithm is disabled so short commands leave right away. Definite-length binary blocks are read into a
+    buffer of the announced length, without searching their payload for the termination. Only the attributes
+    and methods used by the instruments of this package are provided; service requests are not supported, so
+    waits fall back to polling. Reads that time out raise TimeoutError.
+
+    Parameters
+    ----------
+    resource_name : str
+        Name of the resource, e.g. 'TCPIP::192.168.252.20::5025::SOCKET'
+    host : str
+        Host name or address of the instrument
+    port : int
+        TCP port of the SCPI socket
+    timeout : int
+        Milliseconds to wait for the connection and for every read; forever if None
+    """
+
+    def __init__(self, resource_name: str, host: str, port: int = 5025, timeout: int = 2000):
+        self.resource_name = resource_name
+        self.encoding = 'ascii'
+        self.read_termination = '\n'
+        self.write_termination = '\n'
+        self.chunk_size = 20 * 1024
+        self.query_delay = 0.0
+        self._buffer = bytearray()
+        self._socket = socket.create_connection((host, port), None if timeout is None else timeout / 1000)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._timeout = timeout
+
+    @property
+    def timeout(self) -> int:
+        """ Milliseconds to wait for every read; None to wait forever """
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, timeout: int):
+        self._timeout = timeout
+        self._socket.settimeout(None if timeout is None else timeout / 1000)
+
+    def write_raw(self, message: bytes) -> int:
+        self._socket.sendall(message)
+        return len(message)
+
+    def write(self, message: str, termination: str = None, encoding: str = None) -> int:
+        termination = self.write_termination if termination is None else termination
+        return self.write_raw((message + (termination or '')).encode(encoding or self.encoding))
+
+    def read_raw(self, size: int = None) -> bytes:
+        """ Return the bytes received up to and including the read termination. """
+        termination = (self.read_termination or '\n').encode(self.encoding)
+        scanned = 0
+        while True:
+            end = self._buffer.find(termination, scanned)
+            if end >= 0:
+                end += len(termination)
+                message = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                return message
+            scanned = max(len(self._buffer) - len(termination) + 1, 0)
+            self._receive(size or self.chunk_size)
+
+    def read(self, termination: str = None, encoding: str = None) -> str:
+        message = self.read_raw().decode(encoding or self.encoding)
+        termination = self.read_termination if termination is None else termination
+        if termination and message.endswith(termination):
+            message = message[:-len(termination)]
+        return message
+
+    def query(self, message: str, delay: float = None) -> str:
+        self.write(message)
+        return self.read()
+
+    def query_ascii_values(self, message: str, converter='f', separator=',', container=list, delay: float = None):
+        values = self.query(message, delay).strip().split(separator)
+        convert = {'f': float, 'd': int, 's': str}.get(converter, converter)
+        return container([convert(value) for value in values])
+
+    def query_binary_values(self, message: str, datatype='f', is_big_endian=False, container=list,
+                            delay: float = None, header_fmt='ieee', expect_termination=True, **kwargs):
+        self.write(message)
+        payload = self.read_block(expect_termination)
+        dtype = ('>' if is_big_endian else '<') + datatype
+        if container is numpy.array or (isinstance(container, type) and issubclass(container, numpy.ndarray)):
+            return numpy.frombuffer(payload, dtype)
+        return container(struct.unpack(f"{dtype[0]}{len(payload) // struct.calcsize(datatype)}{datatype}", payload))
+
+    def read_block(self, expect_termination: bool = True) -> memoryview:
+        """ Read an IEEE-488.2 definite-length block and return its payload.
+
+        The payload is received straight into a buffer of its announced length, chunk_size bytes at a time.
+
+        Parameters
+        ----------
+        expect_termination : bool
+            True to also read the termination that follows the block
+        """
+        offset, length = Block.header(self._buffer)
+        while length is None:
+            self._receive(self.chunk_size)
+            offset, length = Block.header(self._buffer)
+        payload = bytearray(length)
+        view = memoryview(payload)
+        received = min(len(self._buffer) - offset, length)
+        view[:received] = self._buffer[offset:offset + received]
+        del self._buffer[:offset + received]
+        while received < length:
+            count = self._socket.recv_into(view[received:], min(self.chunk_size, length - received))
+            if not count:
+                raise ConnectionError(f"{self.resource_name} closed the connection")
+            received += count
+        if expect_termination:
+            self.read_raw()
+        return view
+
+    def clear(self):
+        """ Discard the bytes received and not read yet, including those still arriving. """
+        self._buffer.clear()
+        self._socket.setblocking(False)
+        try:
+            while self._socket.recv(self.chunk_size):
+                pass
+        except OSError:
+            pass
+        finally:
+            self.timeout = self._timeout
+
+    def close(self):
+        self._buffer.clear()
+        self._socket.close()
+
+    def _receive(self, size: int):
+        chunk = self._socket.recv(size)
+        if not chunk:
+            raise ConnectionError(f"{self.resource_name} closed the connection")
+        self._buffer += chunk
@@ -0,0 +1,63 @@
+import re
+from typing import TYPE_CHECKING
+
+from utils.SocketResource import SocketResource
+
+if TYPE_CHECKING:
+    from pyvisa import ResourceManager
+
+_SOCKET = re.compile(r"^TCPIP\d*::([^:]+)::(\d+)::SOCKET$", re.IGNORECASE)
+
+
+class SocketResourceManager:
+    """ Resource manager that opens raw SCPI sockets without VISA.
+
+    Pass it to DMM6500 or DP832 in place of a ResourceManager. Resource names in the VISA form
+    'TCPIP::<host>::<port>::SOCKET' open a SocketResource, so scripts switch between VISA and the built-in
+    client without changing the resource name. Other names are opened by the resource manager given, if any.
+
+    Parameters
+    ----------
+    resource_manager : ResourceManager
+        Resource manager used for names that are not sockets; none by default
+    timeout : int
+        Milliseconds to wait for a connection
+
+    Examples
+    --------
+    >>> dmm = DMM6500(SocketResourceManager())
+    >>> dmm.open('TCPIP::192.168.252.20::5025::SOCKET')
+    """
+
+    def __init__(self, resource_manager: 'ResourceManager' = None, timeout: int = 2000):
+        self._resource_manager = resource_manager
+        self.timeout = timeout
+
+    def list_resources(self, query: str = '?*::INSTR'):
+        if self._resource_manager is None:
+            return ()
+        return self._resource_manager.list_resources(query)
+
+    def open_resource(self, resource_name: str, **kwargs):
+        """ Return a SocketResource for a socket resource name, or the resource opened by the resource manager.
+
+        Parameters
+        ----------
+        resource_name : str
+            Name of the resource, e.g. 'TCPIP::192.168.252.20::5025::SOCKET'
+        kwargs
+            Attributes to set on the resource
+        """
+        match = _SOCKET.match(resource_name.strip())
+        if match is None:
+            if self._resource_manager is None:
+                raise ValueError(f"{resource_name} is not a TCPIP::<host>::<port>::SOCKET resource name")
+            return self._resource_manager.open_resource(resource_name, **kwargs)
+        resource = SocketResource(resource_name, match.group(1), int(match.group(2)), self.timeout)
+        for name, value in kwargs.items():
+            setattr(resource, name, value)
+        return resource
+
+    def close(self):
+        if self._resource_manager is not None:
+            self._resource_manager.close()
@@ -0,0 +1,53 @@
+import time
+
+
+class StateCache:
+    """ Last value written to or read from each setting of an instrument.
+
+    Settings are identified by the header of their SCPI command, including the channel, e.g. ':SOUR1:VOLT'.
+    Values older than ttl seconds are considered unknown. Hits count writes that were skipped and queries that
+    were answered from the cache; misses count the ones that had to be sent to the instrument. The session counts
+    them, since only it knows whether a value found in the cache made a message unnecessary.
+    """
+
+    def __init__(self, ttl: float = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._values = {}
+
+    def lookup(self, key: str):
+        """ Return a tuple with True and the value of the setting if it is known, or False and None otherwise.
+
+        Parameters
+        ----------
+        key : str
+            Header of the setting
+        """
+        entry = self._values.get(key)
+        if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+            return True, entry[0]
+        return False, None
+
+    def store(self, key: str, value):
+        """ Remember the present value of a setting.
+
+        Parameters
+        ----------
+        key : str
+            Header of the setting
+        value
+            Value of the setting
+        """
+        self._values[key] = (value, time.monotonic())
+
+    def invalidate(self, prefix: str = ""):
+        """ Forget the value of the settings whose header starts with the prefix; all of them by default.
+
+        Parameters
+        ----------
+        prefix : str
+            Start of the headers of the settings to forget
+        """
+        for key in [key for key in self._values if key.startswith(prefix)]:
+            del self._values[key]
@@ -1,5 +1,7 @@
 from enum import Enum
 
+import numpy
+
 
 class VoltUnit(Enum):
     VOLT = 1
@@ -7,12 +9,15 @@ class VoltUnit(Enum):
     MICRO = 3
 
     def convert(self, value: float) -> str:
-        if self.value == 1:
-            return '{:0=12.9f}'.format(value / 1e-0)
-        elif self.value == 2:
-            return '{:0=8.4f}'.format(value / 1e-3)
-        else:
-            return '{:0=8.4f}'.format(value / 1e-6)
+        return _format(self.value).format(value / _factor(self.value))
+
+    def scale(self, values) -> numpy.ndarray:
+        """ Return the values, in volts, expressed in this unit. Accepts a scalar or an array. """
+        return numpy.asarray(values, dtype=numpy.float64) / _factor(self.value)
+
+    def convert_array(self, values) -> numpy.ndarray:
+        """ Return the values, in volts, formatted in this unit like convert does, as an array of strings. """
+        return _format_array(self.scale(values), *_width(self.value))
 
     def unit(self) -> str:
         if self.value == 1:
@@ -22,6 +27,14 @@ class VoltUnit(Enum):
         else:
             return 'µV'
 
+    @classmethod
+    def best(cls, values) -> 'VoltUnit':
+        """ Return the largest unit in which the largest magnitude of the values, in volts, is at least 1.
+
+        NaN values are ignored. Raises ValueError when there is no other value.
+        """
+        return cls(_best(values))
+
 
 class CurrentUnit(Enum):
     AMP = 1
@@ -29,12 +42,15 @@ class CurrentUnit(Enum):
     MICRO = 3
 
     def convert(self, value: float) -> str:
-        if self.value == 1:
-            return '{:0=12.9f}'.format(value / 1e-0)
-        elif self.value == 2:
-            return '{:0=8.4f}'.format(value / 1e-3)
-        else:
-            return '{:0=8.4f}'.format(value / 1e-6)
+        return _format(self.value).format(value / _factor(self.value))
+
+    def scale(self, values) -> numpy.ndarray:
+        """ Return the values, in amps, expressed in this unit. Accepts a scalar or an array. """
+        return numpy.asarray(values, dtype=numpy.float64) / _factor(self.value)
+
+    def convert_array(self, values) -> numpy.ndarray:
+        """ Return the values, in amps, formatted in this unit like convert does, as an array of strings. """
+        return _format_array(self.scale(values), *_width(self.value))
 
     def unit(self) -> str:
         if self.value == 1:
@@ -43,3 +59,77 @@ class CurrentUnit(Enum):
             return 'mA'
         else:
             return 'µA'
+
+    @classmethod
+    def best(cls, values) -> 'CurrentUnit':
+        """ Return the largest unit in which the largest magnitude of the values, in amps, is at least 1.
+
+        NaN values are ignored. Raises ValueError when there is no other value.
+        """
+        return cls(_best(values))
+
+
+def _factor(unit: int) -> float:
+    if unit == 1:
+        return 1e-0
+    elif unit == 2:
+        return 1e-3
+    else:
+        return 1e-6
+
+
+def _format(unit: int) -> str:
+    return '{:0=12.9f}' if unit == 1 else '{:0=8.4f}'
+
+
+def _width(unit: int):
+    return (12, 9) if unit == 1 else (8, 4)
+
+
+def _format_array(values: numpy.ndarray, width: int, decimals: int) -> numpy.ndarray:
+    # Same output as '{:0=<width>.<decimals>f}' for every value, built from digit bytes without a Python call
+    # per value. Columns: a spare one for the sign, the integer digits, the point and the decimals. Scaling
+    # rounds, so values within a few ulps of a halfway point may round either way; format rounds the exact
+    # binary value, so those are formatted by it, like values that are not finite or too large.
+    values = numpy.atleast_1d(values)
+    scaled = numpy.abs(values) * 10.0 ** decimals
+    special = ~numpy.isfinite(scaled) | (scaled >= 1e12)
+    scaled = numpy.where(special, 0.0, scaled)
+    special |= numpy.abs(scaled - numpy.floor(scaled) - 0.5) <= 4 * numpy.spacing(scaled)
+    fixed = numpy.floor(numpy.where(special, 0.0, scaled) + 0.5).astype(numpy.int64)
+    integer, fraction = numpy.divmod(fixed, 10 ** decimals)
+    negative = numpy.signbit(values)
+    digits = max(len(str(int(integer.max()))) if integer.size else 1, width - 1 - decimals)
+    powers = 10 ** numpy.arange(digits - 1, -1, -1, dtype=numpy.int64)
+    table = numpy.zeros((values.size, digits + decimals + 2), dtype=numpy.uint8)
+    table[:, 1:digits + 1] = integer[:, None] // powers % 10 + ord('0')
+    table[:, digits + 1] = ord('.')
+    if decimals:
+        fraction_powers = 10 ** numpy.arange(decimals - 1, -1, -1, dtype=numpy.int64)
+        table[:, digits + 2:] = fraction[:, None] // fraction_powers % 10 + ord('0')
+    used = (integer[:, None] >= powers[None, :-1]).sum(axis=1) + 1
+    start = 1 + digits - numpy.maximum(used, width - 1 - decimals - negative)
+    start = start - negative
+    table[negative, start[negative]] = ord('-')
+    columns = start[:, None] + numpy.arange(table.shape[1])[None, :]
+    inside = columns < table.shape[1]
+    text = numpy.where(inside, table[numpy.arange(values.size)[:, None], numpy.where(inside, columns, 0)], 0)
+    text = numpy.ascontiguousarray(text, dtype=numpy.uint8).view(f'S{table.shape[1]}').ravel().astype(str)
+    if special.any():
+        text = text.astype(object)
+        text[special] = [f'{{:0={width}.{decimals}f}}'.format(value) for value in values[special]]
+        text = text.astype(str)
+    return text
+
+
+def _best(values) -> int:
+    values = numpy.asarray(values, dtype=numpy.float64)
+    if values.size == 0 or numpy.isnan(values).all():
+        raise ValueError("The best unit needs at least one value that is not NaN")
+    magnitude = float(numpy.nanmax(numpy.abs(values)))
+    if magnitude >= 1:
+        return 1
+    elif magnitude >= 1e-3:
+        return 2
+    else:
+        return 3
@@ -0,0 +1,36 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+from dmm6500.AsyncDMM6500 import AsyncDMM6500
+from dmm6500.FetchPlanner import FetchPlanner
+from dmm6500.Trace import Element
+from dmm6500.Trace import Format
+from simulator.SimulatedDMM6500 import SimulatedDMM6500
+from simulator.SimulatedResourceManager import SimulatedResourceManager
+
+_COUNT = 50000
+
+
+def test_blocks_resume_on_any_worker():
+    readings = numpy.arange(_COUNT) * 1e-3
+    simulator = SimulatedDMM6500(capacity=_COUNT)
+    simulator.load('defbuffer1', readings)
+
+    async def main():
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            dmm = AsyncDMM6500(SimulatedResourceManager({'SIM': simulator}), executor)
+            dmm._target.planner = FetchPlanner(rate=1e5, target_seconds=0.01, min_sample=1 << 30)
+            await dmm.open('SIM')
+            blocks = []
+            async for block in dmm.trace.blocks(_COUNT, 'defbuffer1', [Element.READING], Format.REAL):
+                blocks.append(block[:, 0].copy())
+                # Another call in between must neither deadlock nor find the session held
+                assert (await asyncio.wait_for(dmm.query_id(), 5)).startswith('KEITHLEY')
+            await dmm.close()
+            return blocks
+
+    blocks = asyncio.run(main())
+    assert len(blocks) > 1
+    numpy.testing.assert_array_equal(numpy.concatenate(blocks), readings)
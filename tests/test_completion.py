@@ -0,0 +1,21 @@
+import sys
+
+from dmm6500.DMM6500 import DMM6500
+from simulator.SimulatedDMM6500 import SimulatedDMM6500
+from simulator.SimulatedResourceManager import SimulatedResourceManager
+from simulator.SimulatedServer import SimulatedServer
+from utils.SocketResourceManager import SocketResourceManager
+
+
+def test_wait_complete_without_pyvisa(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyvisa', None)  # Any import of pyvisa fails
+    simulator = SimulatedDMM6500()
+    with SimulatedServer(simulator) as server:
+        for resource_manager, resource_name in ((SimulatedResourceManager({'SIM': simulator}), 'SIM'),
+                                                (SocketResourceManager(), server.resource_name)):
+            dmm = DMM6500(resource_manager)
+            dmm.open(resource_name)
+            try:
+                assert dmm.wait_complete(2)
+            finally:
+                dmm.close()
@@ -0,0 +1,21 @@
+import numpy
+
+from dmm6500.DMM6500 import DMM6500
+from dmm6500.Trace import Element
+from dmm6500.Trace import Format
+from simulator.SimulatedDMM6500 import SimulatedDMM6500
+from simulator.SimulatedResourceManager import SimulatedResourceManager
+
+
+def test_fetch_after_format_selects_byte_order():
+    readings = numpy.arange(1000) * 1e-3
+    simulator = SimulatedDMM6500(capacity=1000)
+    simulator.load('defbuffer1', readings)
+    simulator.execute(':FORM:BORD NORM')  # Left big-endian, like the default of the instrument
+    dmm = DMM6500(SimulatedResourceManager({'SIM': simulator}))
+    dmm.open('SIM')
+    for data_format in (Format.REAL, Format.SREAL):
+        dmm.trace.format(data_format)
+        fetched = dmm.trace.fetch(1000, 'defbuffer1', Element.READING, data_format)
+        numpy.testing.assert_allclose(fetched, readings, rtol=1e-6)
+    dmm.close()
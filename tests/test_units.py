@@ -0,0 +1,33 @@
+import numpy
+import pytest
+
+from utils.Units import CurrentUnit
+from utils.Units import VoltUnit
+
+
+@pytest.mark.parametrize('unit', list(VoltUnit) + list(CurrentUnit))
+def test_convert_array_matches_convert(unit):
+    rng = numpy.random.default_rng(0)
+    values = numpy.concatenate([
+        [0.0, -0.0, 5e-10, -5e-10, 1.5e-9, 2.5e-9, 5e-5, 5e-8, 0.12345, 1.00005, -3.3, 12.0, 1e7],
+        [numpy.nan, numpy.inf, -numpy.inf],
+        rng.normal(0.0, 1.0, 1000) * 10.0 ** rng.integers(-9, 3, 1000),
+        numpy.round(rng.uniform(-20, 20, 1000), 9) + 5e-10,  # Halfway points of the volt format
+    ])
+    expected = [unit.convert(value) for value in values]
+    assert unit.convert_array(values).tolist() == expected
+
+
+def test_convert_array_rounds_halfway_like_convert():
+    assert VoltUnit.VOLT.convert_array(5e-10)[0] == VoltUnit.VOLT.convert(5e-10) == '00.000000001'
+
+
+@pytest.mark.parametrize('values', [[], [numpy.nan], [numpy.nan, numpy.nan]])
+def test_best_needs_a_value(values):
+    with pytest.raises(ValueError):
+        VoltUnit.best(values)
+
+
+def test_best_ignores_nan():
+    assert VoltUnit.best([numpy.nan, 2e-3]) == VoltUnit.MILLI
+    assert CurrentUnit.best([-1.5, numpy.nan]) == CurrentUnit.AMP